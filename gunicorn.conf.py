@@ -0,0 +1,13 @@
+# Production serving: gunicorn -c gunicorn.conf.py src.app:app
+#
+# One worker process serves requests on a pool of threads, so a slow LLM call
+# only ties up one thread. Call sessions, the LLM_MAX_IN_FLIGHT cap, /metrics,
+# the classification cache and the call log indexes are kept per process, so
+# more workers would each hold their own copy; add threads instead.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "100"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
@@ -1,34 +1,78 @@
+import os
 import logging
-from opentelemetry import trace as trace_api
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk import trace as trace_sdk
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from openinference.instrumentation.langchain import LangChainInstrumentor
-from phoenix.otel import register
-from src.services.llm.classifier import process_emergency_call
+import threading
 from src.utils.storage import save_call_to_json
+from src.utils.metrics import stage
 
 logger = logging.getLogger(__name__)
 
-# Initialize tracing
-tracer_provider = register(
-    project_name="911evaluator",
-    endpoint="http://localhost:6006/v1/traces",
-)
+_tracer_provider = None
+_tracing_lock = threading.Lock()
 
-LangChainInstrumentor().instrument(tracer_provider=tracer_provider)
 
-def process_call(call_text: str) -> dict:
-    """Process a call with telemetry tracking."""
+def init_tracing():
+    """Set up tracing to Phoenix, once.
+
+    Spans are queued and exported in batches from a background thread, so a
+    slow or missing collector never adds latency to a call. When the queue is
+    full new spans are dropped, and queued spans are flushed on shutdown.
+    """
+    global _tracer_provider
+    with _tracing_lock:
+        if _tracer_provider is not None:
+            return _tracer_provider
+        if os.getenv("TRACING_ENABLED", "true").lower() not in ("1", "true", "yes"):
+            return None
+
+        # The SDKs are imported here so importing this module stays cheap
+        from opentelemetry import trace as trace_api
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk import trace as trace_sdk
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from openinference.instrumentation.langchain import LangChainInstrumentor
+        from openinference.semconv.resource import ResourceAttributes
+
+        endpoint = os.getenv("PHOENIX_COLLECTOR_ENDPOINT", "http://localhost:6006/v1/traces")
+        exporter = OTLPSpanExporter(
+            endpoint=endpoint,
+            timeout=float(os.getenv("TRACING_EXPORT_TIMEOUT", "5")),
+        )
+        # The provider shuts down at exit, which flushes the queued spans
+        tracer_provider = trace_sdk.TracerProvider(
+            resource=Resource({ResourceAttributes.PROJECT_NAME: "911evaluator"}),
+        )
+        tracer_provider.add_span_processor(
+            BatchSpanProcessor(
+                exporter,
+                max_queue_size=int(os.getenv("TRACING_MAX_QUEUE_SIZE", "2048")),
+                schedule_delay_millis=int(os.getenv("TRACING_EXPORT_DELAY_MS", "1000")),
+                max_export_batch_size=512,
+            )
+        )
+        trace_api.set_tracer_provider(tracer_provider)
+        LangChainInstrumentor().instrument(tracer_provider=tracer_provider)
+
+        logger.info(f"Exporting traces in batches to {endpoint}")
+        _tracer_provider = tracer_provider
+        return _tracer_provider
+
+
+def process_call(call_text: str, on_update=None, previous=None, call_sid: str = None):
+    """Process a call with telemetry tracking; returns its `Classification`."""
+    init_tracing()
+    # LangChain is loaded on first use or by the warm-up thread, not at startup
+    from src.services.llm.classifier import process_emergency_call
     try:
         # Process the call using the LLM
-        response = process_emergency_call(call_text)
-        
+        response = process_emergency_call(call_text, on_update=on_update, previous=previous)
+
         # Save to JSON file
-        save_call_to_json(call_text, response)
-        
+        with stage("save"):
+            save_call_to_json(call_text, response.to_dict(), call_sid=call_sid)
+
         return response
-        
+
     except Exception as e:
         logger.error(f"Error in process_call: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -1,7 +1,22 @@
+import os
+import sys
+import time
 import logging
-from flask import Blueprint, request, render_template
+from datetime import datetime
+from functools import partial
+from flask import Blueprint, Response, current_app, request, render_template
 from flask_socketio import SocketIO
 from src.services.twilio.handlers import TwilioHandler
+from src.services.llm.rules import get_rule_stats
+from src.services.llm.cache import get_classification_cache
+from src.services.feed import get_live_feed, publish_update
+from src.services.llm.scheduler import get_scheduler
+from src.services.jobs import job_queue_depth
+from src.utils.metrics import metrics, stage
+from src.services.analytics import PRIORITIES, get_call_index
+from src.services.search import get_search_index
+from src.services.transcription import create_transcriber
+from src.services.twilio.media_stream import MediaStream, serve_media_stream
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -11,6 +26,25 @@ logger = logging.getLogger(__name__)
 api = Blueprint('api', __name__)
 socketio = SocketIO()
 
+# Queue depths reported on /metrics
+metrics.register_gauge("job_queue_depth", "queue", lambda: {"speech_jobs": job_queue_depth()})
+metrics.register_gauge("llm_in_flight", "backend", lambda: {"openai": llm_requests_in_flight()})
+metrics.register_gauge(
+    "llm_queue_depth",
+    "priority",
+    lambda: {p: s["waiting"] for p, s in get_scheduler().stats()["priorities"].items()},
+)
+
+def llm_requests_in_flight() -> int:
+    """Requests open with OpenAI, counting hedges, retries and abandoned attempts."""
+    classifier = sys.modules.get("src.services.llm.classifier")
+    # Until the classifier is loaded no request can have been sent
+    return classifier.LLMHandler.client_stats().get("in_flight", 0) if classifier else 0
+
+def get_twilio_handler() -> TwilioHandler:
+    """The handler shared by all requests, created in `create_app`."""
+    return current_app.extensions["twilio_handler"]
+
 @api.route("/", methods=["GET"])
 def home():
     """Test route to verify server is running"""
@@ -20,14 +54,19 @@ def home():
 def answer_call():
     """Handle incoming phone calls"""
     logger.info("Received incoming call")
-    handler = TwilioHandler()
-    return handler.handle_incoming_call()
+    return get_twilio_handler().handle_incoming_call(request.values.get("CallSid"))
 
 @api.route("/call_results", methods=["GET"])
 def call_results():
     """Display the results of the call processing"""
     return render_template('emergency_dashboard.html')
 
+@api.route("/call_results/state", methods=["GET"])
+def call_results_state():
+    """Snapshot of the live feed, or only the calls changed after `since`"""
+    since = request.args.get("since", type=int)
+    return get_live_feed().state(since)
+
 @api.route("/test_socket", methods=["GET"])
 def test_socket():
     """Test the websocket connection"""
@@ -37,15 +76,94 @@ def test_socket():
         "summary": "This is a test message",
         "confidence": 95,
     }
-    socketio.emit("send_message", test_data)
-    return test_data
+    return publish_update(socketio, "send_message", test_data)
+
+@api.route("/rules_stats", methods=["GET"])
+def rules_stats():
+    """Report how many calls the keyword rules answered without the LLM"""
+    return get_rule_stats()
+
+@api.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    """Report hit/miss counters for the classification cache"""
+    cache = get_classification_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+@api.route("/scheduler_stats", methods=["GET"])
+def scheduler_stats():
+    """Report LLM queue depth and wait times per suspected priority"""
+    return get_scheduler().stats()
+
+@api.route("/llm_stats", methods=["GET"])
+def llm_stats():
+    """Report LLM retries, hedged requests, timeouts and the circuit breaker state"""
+    from src.services.llm.classifier import LLMHandler
+    return LLMHandler.client_stats()
+
+@api.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus scrape endpoint for stage latencies, errors and queue depths"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+def analytics_window():
+    """Time window from `minutes` (the last N minutes) or ISO `since`/`until`"""
+    minutes = request.args.get("minutes")
+    if minutes is not None:
+        return time.time() - 60 * float(minutes), None
+    since, until = request.args.get("since"), request.args.get("until")
+    return (
+        datetime.fromisoformat(since).timestamp() if since else None,
+        datetime.fromisoformat(until).timestamp() if until else None,
+    )
+
+@api.route("/analytics/summary", methods=["GET"])
+def analytics_summary():
+    """Call counts per priority and department, and the confidence distribution"""
+    try:
+        since, until = analytics_window()
+    except ValueError as e:
+        return {"error": f"Invalid time window: {e}"}, 400
+    priority = request.args.get("priority")
+    if priority is not None and priority not in PRIORITIES:
+        return {"error": f"Unknown priority: {priority}"}, 400
+
+    index = get_call_index()
+    return {
+        "counts": index.counts(since, until),
+        "confidence": index.confidence_distribution(since, until, priority),
+    }
+
+@api.route("/search", methods=["GET"])
+def search_calls():
+    """Search past calls by keyword, best matches first"""
+    query = request.args.get("q", "")
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), 100)
+    return get_search_index().search(query, page, per_page)
+
+@api.route("/media_stream", websocket=True)
+def media_stream():
+    """Twilio Media Streams websocket: classify the caller's words while they are still talking"""
+    from src.services.llm.classifier import process_emergency_call
+    stream = MediaStream(
+        socketio,
+        create_transcriber(),
+        # Partial transcripts never recur, so they are kept out of the cache
+        partial(process_emergency_call, use_cache=False),
+        buffer_seconds=float(os.getenv("MEDIA_STREAM_BUFFER_SECONDS", "10")),
+        min_new_words=int(os.getenv("PARTIAL_MIN_WORDS", "3")),
+        min_interval=float(os.getenv("PARTIAL_MIN_INTERVAL", "3")),
+    )
+    return serve_media_stream(request.environ, stream)
 
 @api.route("/process_speech", methods=["POST"])
 def process_speech():
     """Process the speech input from the caller"""
-    logger.info("Processing speech from call")
-    speech_result = request.values.get("SpeechResult", "")
-    logger.info(f"Received speech: {speech_result}")
-    
-    handler = TwilioHandler()
-    return handler.handle_speech_processing(speech_result, socketio)
\ No newline at end of file
+    with stage("webhook"):
+        logger.info("Processing speech from call")
+        speech_result = request.values.get("SpeechResult", "")
+        logger.info(f"Received speech: {speech_result}")
+        
+        return get_twilio_handler().handle_speech_processing(
+            speech_result, socketio, request.values.get("CallSid")
+        )
\ No newline at end of file
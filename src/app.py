@@ -4,6 +4,11 @@ from pathlib import Path
 from dotenv import load_dotenv
 from flask import Flask
 from src.api.routes import api, socketio
+from src.services.twilio.handlers import TwilioHandler
+from src.api.arize import init_tracing
+from src.utils.warmup import start_warm_up
+from src.services.analytics import get_call_index
+from src.services.search import get_search_index
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -29,14 +34,27 @@ def create_app():
     
     # Register blueprints
     app.register_blueprint(api)
+
+    # Heavy SDKs and the call log indexes load in the background so the app
+    # can answer right away
+    start_warm_up(init_tracing, get_call_index, get_search_index)
+
+    # One Twilio handler, and its pooled HTTP session, for the whole app
+    app.extensions["twilio_handler"] = TwilioHandler()
     
-    # Initialize SocketIO
-    socketio.init_app(app)
+    # Initialize SocketIO. With a message queue (e.g. redis://localhost:6379),
+    # emits from any worker process reach every connected dashboard.
+    message_queue = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    if message_queue:
+        logger.info(f"Sharing SocketIO state through {message_queue}")
+    socketio.init_app(app, message_queue=message_queue)
     
     return app
 
 app = create_app()
 
 if __name__ == "__main__":
+    # Development server; use gunicorn with gunicorn.conf.py in production
+    debug = os.getenv("FLASK_DEBUG", "false").lower() in ("1", "true", "yes")
     logger.info("Starting Flask application...")
-    socketio.run(app, debug=True, port=5000)
\ No newline at end of file
+    socketio.run(app, debug=debug, port=int(os.getenv("PORT", "5000")))
\ No newline at end of file
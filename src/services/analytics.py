@@ -0,0 +1,178 @@
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+from src.utils.storage import get_call_log_store
+from src.services.llm.result import ClassificationError, EmergencyPriority, parse_confidence
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = tuple(priority.name for priority in EmergencyPriority)
+MISSING = -1
+
+
+class CallLogIndex:
+    """Columnar in-memory index of the call log.
+
+    Each field is a NumPy array: timestamps as epoch seconds, priority and
+    department as small integer codes, and confidence as an integer (-1 when
+    missing or unparseable). Queries are vectorized over these arrays.
+    Appends grow the arrays geometrically, so adding a call is amortized O(1).
+    NumPy is imported when the first index is built, not with the app.
+    Degraded classifications are fallbacks, not model output, and are left out.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        import numpy as np
+
+        self.size = 0
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.priorities = np.empty(capacity, dtype=np.int8)
+        self.departments = np.empty(capacity, dtype=np.int16)
+        self.confidences = np.empty(capacity, dtype=np.int16)
+        self.department_names = []
+        self._department_codes = {}
+        # While timestamps arrive in order, time windows are found by binary search
+        self._sorted = True
+        self._lock = threading.Lock()
+
+    def _department_code(self, department: Optional[str]) -> int:
+        if not department:
+            return MISSING
+        code = self._department_codes.get(department)
+        if code is None:
+            code = self._department_codes[department] = len(self.department_names)
+            self.department_names.append(department)
+        return code
+
+    def _grow(self, needed: int):
+        import numpy as np
+
+        capacity = len(self.timestamps)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("timestamps", "priorities", "departments", "confidences"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self.size] = column[: self.size]
+            setattr(self, name, grown)
+
+    def append(self, call: dict):
+        if call.get("degraded"):
+            return
+        try:
+            timestamp = datetime.fromisoformat(call["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            logger.error(f"Skipping call without a valid timestamp: {call.get('timestamp')}")
+            return
+        try:
+            confidence = parse_confidence(call.get("confidence"))
+        except ClassificationError:
+            confidence = MISSING
+        priority = call.get("priority")
+
+        with self._lock:
+            self._grow(self.size + 1)
+            i = self.size
+            self.timestamps[i] = timestamp
+            self.priorities[i] = PRIORITIES.index(priority) if priority in PRIORITIES else MISSING
+            self.departments[i] = self._department_code(call.get("department"))
+            self.confidences[i] = confidence
+            if i and timestamp < self.timestamps[i - 1]:
+                self._sorted = False
+            self.size += 1
+
+    def extend(self, calls: Iterable[dict]):
+        for call in calls:
+            self.append(call)
+
+    def _window(self, since: Optional[float], until: Optional[float]):
+        """Index (slice or boolean mask) of the calls in [since, until)."""
+        import numpy as np
+
+        timestamps = self.timestamps[: self.size]
+        if self._sorted:
+            start = 0 if since is None else int(np.searchsorted(timestamps, since, side="left"))
+            end = self.size if until is None else int(np.searchsorted(timestamps, until, side="left"))
+            return slice(start, end)
+        mask = np.ones(self.size, dtype=bool)
+        if since is not None:
+            mask &= timestamps >= since
+        if until is not None:
+            mask &= timestamps < until
+        return mask
+
+    def counts(self, since: float = None, until: float = None) -> dict:
+        """Number of calls per priority and department in the time window."""
+        import numpy as np
+
+        with self._lock:
+            window = self._window(since, until)
+            priorities = self.priorities[: self.size][window].astype(np.int32)
+            departments = self.departments[: self.size][window].astype(np.int32)
+            n_departments = len(self.department_names) + 1
+            # Shift the codes so "missing" (-1) becomes bucket 0
+            combined = (priorities + 1) * n_departments + (departments + 1)
+            table = np.bincount(combined, minlength=(len(PRIORITIES) + 1) * n_departments)
+            table = table.reshape(len(PRIORITIES) + 1, n_departments)
+            department_labels = ["UNKNOWN"] + self.department_names
+
+        priority_labels = ["UNKNOWN"] + list(PRIORITIES)
+        return {
+            "total": int(table.sum()),
+            "by_priority": {
+                label: int(count) for label, count in zip(priority_labels, table.sum(axis=1)) if count
+            },
+            "by_department": {
+                label: {
+                    p_label: int(table[p, d]) for p, p_label in enumerate(priority_labels) if table[p, d]
+                }
+                for d, label in enumerate(department_labels)
+                if table[:, d].any()
+            },
+        }
+
+    def confidence_distribution(self, since: float = None, until: float = None, priority: str = None) -> dict:
+        """Histogram of confidence in bins of 10, with mean and quartiles."""
+        import numpy as np
+
+        with self._lock:
+            window = self._window(since, until)
+            confidences = self.confidences[: self.size][window]
+            if priority is not None:
+                confidences = confidences[self.priorities[: self.size][window] == PRIORITIES.index(priority)]
+            confidences = confidences[confidences != MISSING]
+
+        histogram, edges = np.histogram(confidences, bins=10, range=(0, 100))
+        result = {
+            "count": int(confidences.size),
+            "histogram": {f"{int(lo)}-{int(hi)}": int(n) for lo, hi, n in zip(edges, edges[1:], histogram)},
+        }
+        if confidences.size:
+            q1, median, q3 = np.percentile(confidences, [25, 50, 75])
+            result.update(mean=float(confidences.mean()), p25=float(q1), median=float(median), p75=float(q3))
+        return result
+
+
+_index: Optional[CallLogIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_call_index() -> CallLogIndex:
+    """The shared index, loaded from the call log on first use and kept current on every save.
+
+    The log is replayed without holding its write lock, so saves go on
+    while the index loads.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            started = time.perf_counter()
+            index = CallLogIndex()
+            get_call_log_store().subscribe(index.append)
+            logger.info(f"Indexed {index.size} calls in {time.perf_counter() - started:.2f}s")
+            _index = index
+        return _index
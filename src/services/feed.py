@@ -0,0 +1,181 @@
+import os
+import json
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from src.utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+
+class LiveFeed:
+    """Server-side state of the most recent classifications on the dashboard.
+
+    Every update gets the next sequence number and is merged into the card of
+    its call, keeping at most `max_calls` cards. Updates marked `partial`,
+    from a transcript still being spoken, never replace a card that already
+    has a final classification. Clients that miss events can
+    ask for everything that changed since the last sequence number they saw
+    and receive one coalesced entry per call instead of every delta.
+
+    This feed lives in the process that published the update; several
+    workers share a `RedisLiveFeed` instead.
+    """
+
+    def __init__(self, max_calls: int = 100):
+        self.max_calls = max_calls
+        self.seq = 0
+        self._calls = OrderedDict()
+        # Highest sequence number of a call that has been dropped from the feed
+        self._evicted_seq = 0
+        self._lock = threading.Lock()
+
+    def publish(self, fields: dict) -> Optional[dict]:
+        """Record an update and return it as a sequence-numbered delta, or None if it is stale."""
+        with self._lock:
+            call_id = fields.get("call_id") or uuid.uuid4().hex
+            partial = bool(fields.get("partial"))
+            if partial and not self._calls.get(call_id, {}).get("partial", True):
+                return None
+            self.seq += 1
+            delta = {**fields, "call_id": call_id, "partial": partial, "seq": self.seq}
+
+            call = self._calls.pop(call_id, {})
+            call.update(delta)
+            self._calls[call_id] = call
+            while len(self._calls) > self.max_calls:
+                _, evicted = self._calls.popitem(last=False)
+                self._evicted_seq = max(self._evicted_seq, evicted["seq"])
+            return delta
+
+    def state(self, since: Optional[int] = None) -> dict:
+        """Calls changed after `since`, or all of them.
+
+        `reset` tells the client to drop what it has, because calls it may be
+        showing are no longer in the feed.
+        """
+        with self._lock:
+            reset = since is None or since < self._evicted_seq or since > self.seq
+            calls = [
+                dict(call) for call in self._calls.values()
+                if reset or call["seq"] > since
+            ]
+            return {"seq": self.seq, "reset": reset, "calls": calls}
+
+
+# Merges an update into its call's card, as LiveFeed.publish does, in one step
+_PUBLISH_SCRIPT = """
+local card = redis.call('HGET', KEYS[2], ARGV[1])
+card = card and cjson.decode(card) or {}
+if ARGV[3] == '1' and card['partial'] == false then
+    return false
+end
+local seq = redis.call('INCR', KEYS[1])
+local delta = cjson.decode(ARGV[2])
+delta['seq'] = seq
+for key, value in pairs(delta) do
+    card[key] = value
+end
+redis.call('HSET', KEYS[2], ARGV[1], cjson.encode(card))
+redis.call('ZADD', KEYS[3], seq, ARGV[1])
+local excess = redis.call('ZCARD', KEYS[3]) - tonumber(ARGV[4])
+if excess > 0 then
+    local evicted = redis.call('ZRANGE', KEYS[3], 0, excess - 1, 'WITHSCORES')
+    for i = 1, #evicted, 2 do
+        redis.call('HDEL', KEYS[2], evicted[i])
+    end
+    redis.call('ZREMRANGEBYRANK', KEYS[3], 0, excess - 1)
+    local evicted_seq = tonumber(evicted[#evicted])
+    if evicted_seq > tonumber(redis.call('GET', KEYS[4]) or '0') then
+        redis.call('SET', KEYS[4], evicted_seq)
+    end
+end
+return cjson.encode(delta)
+"""
+
+_STATE_SCRIPT = """
+local seq = tonumber(redis.call('GET', KEYS[1]) or '0')
+local evicted_seq = tonumber(redis.call('GET', KEYS[4]) or '0')
+local since = tonumber(ARGV[1])
+local reset = since == nil or since < evicted_seq or since > seq
+local ids
+if reset then
+    ids = redis.call('ZRANGE', KEYS[3], 0, -1)
+else
+    ids = redis.call('ZRANGEBYSCORE', KEYS[3], '(' .. since, '+inf')
+end
+local cards = {}
+if #ids > 0 then
+    cards = redis.call('HMGET', KEYS[2], unpack(ids))
+end
+return {seq, reset and 1 or 0, cards}
+"""
+
+
+class RedisLiveFeed(LiveFeed):
+    """The live feed kept in Redis, shared by every worker process.
+
+    Sequence numbers come from one counter, so a dashboard gets a single
+    ordered stream whichever worker published an update, and
+    `/call_results/state` answers the same from any worker. Each update is
+    applied by a Lua script, atomically.
+    """
+
+    def __init__(self, client, max_calls: int = 100, prefix: str = "live_feed"):
+        self.max_calls = max_calls
+        self._redis = client
+        self._keys = [f"{prefix}:{name}" for name in ("seq", "calls", "order", "evicted_seq")]
+        self._publish = self._redis.register_script(_PUBLISH_SCRIPT)
+        self._state = self._redis.register_script(_STATE_SCRIPT)
+
+    @property
+    def seq(self) -> int:
+        return int(self._redis.get(self._keys[0]) or 0)
+
+    def publish(self, fields: dict) -> Optional[dict]:
+        call_id = fields.get("call_id") or uuid.uuid4().hex
+        partial = bool(fields.get("partial"))
+        delta = self._publish(
+            keys=self._keys,
+            args=[call_id, json.dumps({**fields, "call_id": call_id, "partial": partial}), int(partial), self.max_calls],
+        )
+        return json.loads(delta) if delta else None
+
+    def state(self, since: Optional[int] = None) -> dict:
+        seq, reset, cards = self._state(keys=self._keys, args=["" if since is None else since])
+        return {"seq": seq, "reset": bool(reset), "calls": [json.loads(card) for card in cards if card]}
+
+
+_feed: Optional[LiveFeed] = None
+_feed_lock = threading.Lock()
+
+
+def get_live_feed() -> LiveFeed:
+    """The feed, shared through Redis when SocketIO uses it as its message queue."""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            max_calls = int(os.getenv("LIVE_FEED_SIZE", "100"))
+            message_queue = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+            if message_queue.startswith(("redis://", "rediss://")):
+                import redis
+
+                _feed = RedisLiveFeed(redis.Redis.from_url(message_queue), max_calls)
+            else:
+                _feed = LiveFeed(max_calls)
+        return _feed
+
+
+def publish_update(socketio, event: str, fields: dict) -> Optional[dict]:
+    """Record an update in the live feed and push it to the dashboards.
+
+    Returns the delta, or None for a partial update that arrived after the
+    final classification and was dropped.
+    """
+    with stage("socket_emit"):
+        delta = get_live_feed().publish(fields)
+        if delta is not None:
+            socketio.emit(event, delta)
+    return delta
@@ -0,0 +1,169 @@
+import os
+import uuid
+import logging
+import itertools
+import threading
+from collections import deque
+from queue import PriorityQueue
+from typing import Callable, Optional
+from src.services.feed import publish_update
+from src.services.llm.result import Classification
+from src.services.llm.rules import PRIORITY_RANK, suspected_priority
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechJobQueue:
+    """In-process job queue served by a pool of worker threads.
+
+    Speech results are queued by the webhook and classified in the background,
+    so the Twilio request can be answered without waiting on the LLM.
+
+    Each call's utterances wait in their own first-in, first-out queue and
+    are classified one at a time, so a later turn never overtakes an earlier
+    one. Calls are picked up in order of the most urgent suspected priority
+    among their waiting utterances, RED first.
+    """
+
+    def __init__(self, process: Callable[..., Classification], socketio, num_workers: int = 4):
+        self.process = process
+        self.socketio = socketio
+        self.num_workers = num_workers
+        # (rank, order, call id) of calls with utterances waiting; a call may
+        # appear more than once after a more urgent utterance arrives
+        self.jobs = PriorityQueue()
+        self._order = itertools.count()
+        self._workers = []
+        self._lock = threading.Lock()
+        # Waiting (rank, speech result, session) per call id, and the calls being classified
+        self._calls = {}
+        self._active = set()
+        self._calls_lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.num_workers):
+                worker = threading.Thread(
+                    target=self._work, name=f"speech-worker-{i}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+            logger.info(f"Started {self.num_workers} speech workers")
+
+    def submit(self, speech_result: str, session=None) -> str:
+        """Queue a speech result for classification and return its call id."""
+        self.start()
+        call_id = session.call_sid if session is not None else uuid.uuid4().hex
+        rank = PRIORITY_RANK[suspected_priority(speech_result)]
+        with self._calls_lock:
+            waiting = self._calls.setdefault(call_id, deque())
+            # A call already in line only moves up for a more urgent utterance
+            schedule = call_id not in self._active and all(rank < queued for queued, _, _ in waiting)
+            waiting.append((rank, speech_result, session))
+            if schedule:
+                self.jobs.put((rank, next(self._order), call_id))
+        return call_id
+
+    def depth(self) -> int:
+        with self._calls_lock:
+            return sum(len(waiting) for waiting in self._calls.values())
+
+    def _work(self):
+        while True:
+            _, _, call_id = self.jobs.get()
+            if call_id is None:
+                self.jobs.task_done()
+                break
+            with self._calls_lock:
+                # Skip the extra entries of calls already taken by a worker
+                if call_id in self._active or not self._calls.get(call_id):
+                    self.jobs.task_done()
+                    continue
+                self._active.add(call_id)
+                _, speech_result, session = self._calls[call_id].popleft()
+            try:
+                result = classify_utterance(
+                    self.process, self.socketio, call_id, speech_result, session
+                )
+                logger.info(f"Processing result: {result}")
+            except Exception as e:
+                logger.error(f"Error in speech worker: {e}")
+            finally:
+                with self._calls_lock:
+                    self._active.discard(call_id)
+                    waiting = self._calls[call_id]
+                    if waiting:
+                        rank = min(queued for queued, _, _ in waiting)
+                        self.jobs.put((rank, next(self._order), call_id))
+                    else:
+                        del self._calls[call_id]
+                self.jobs.task_done()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers once the queued jobs have been processed."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        # Stop markers sort after every queued job
+        for _ in workers:
+            self.jobs.put((len(PRIORITY_RANK), next(self._order), None))
+        if wait:
+            for worker in workers:
+                worker.join()
+
+
+def classify_utterance(process, socketio, call_id: str, speech_result: str, session=None):
+    """Classify one utterance and push the result to the dashboard card `call_id`.
+
+    With a call session, the utterance is classified in the context of the
+    call's previous classification and the session is updated with the result.
+    """
+    on_update = partial_update_emitter(socketio, call_id)
+    if session is None:
+        result = process(speech_result, on_update=on_update)
+    else:
+        with session.lock:
+            try:
+                result = process(
+                    speech_result,
+                    on_update=on_update,
+                    previous=session.classification,
+                    call_sid=session.call_sid,
+                )
+            except Exception:
+                session.record(speech_result, None)
+                raise
+            session.record(speech_result, result)
+    publish_update(socketio, "send_message", {**result.to_dict(), "call_id": call_id})
+    return result
+
+
+def partial_update_emitter(socketio, call_id: str):
+    """Build an `on_update` callback that pushes streamed fields to the dashboard."""
+    def emit_update(fields: dict):
+        publish_update(socketio, "classification_update", {**fields, "call_id": call_id})
+    return emit_update
+
+
+_job_queue: Optional[SpeechJobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def async_processing_enabled() -> bool:
+    return os.getenv("ASYNC_SPEECH_PROCESSING", "false").lower() in ("1", "true", "yes")
+
+
+def job_queue_depth() -> int:
+    """Jobs waiting in the background queue, or 0 if it was never started."""
+    return _job_queue.depth() if _job_queue is not None else 0
+
+
+def get_job_queue(process: Callable[..., Classification], socketio) -> SpeechJobQueue:
+    """Return the shared job queue, creating it on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            num_workers = int(os.getenv("SPEECH_WORKERS", "4"))
+            _job_queue = SpeechJobQueue(process, socketio, num_workers=num_workers)
+        return _job_queue
@@ -0,0 +1,176 @@
+import os
+import logging
+import threading
+from typing import List, Optional
+from src.utils.storage import ROOT_DIR, get_call_log_store
+from .local_model import TfidfCentroidModel
+from .scheduler import get_scheduler
+from .voting import classify_by_vote, sampling_settings
+from .rules import classify_by_rules, fast_path_enabled, keep_escalation, suspected_priority
+from .result import Classification, ClassificationError, Department, EmergencyPriority
+
+logger = logging.getLogger(__name__)
+
+
+class ClassifierBackend:
+    """A way of classifying a transcript.
+
+    `classify` returns the classification, or None to pass the call on
+    to the next backend in the chain. `previous` is the classification of the
+    earlier turns of the same call, if any.
+    """
+
+    name = None
+
+    def classify(
+        self, call_text: str, on_update=None, previous: Optional[Classification] = None
+    ) -> Optional[Classification]:
+        raise NotImplementedError
+
+
+class OpenAIBackend(ClassifierBackend):
+    """The remote GPT-4 classifier, scheduled by suspected priority.
+
+    With `LLM_SAMPLES` above 1, several samples are drawn concurrently and
+    the priority is decided by majority vote; each sample holds its own
+    scheduler slot.
+    """
+
+    name = "openai"
+
+    def __init__(self):
+        self.sampling = sampling_settings()
+
+    def classify(
+        self, call_text: str, on_update=None, previous: Optional[Classification] = None
+    ) -> Optional[Classification]:
+        from .classifier import classify_with_llm
+        scheduler = get_scheduler()
+        if self.sampling["samples"] == 1:
+            with scheduler.slot(call_text):
+                return classify_with_llm(call_text, on_update=on_update, previous=previous)
+        return classify_by_vote(
+            lambda: classify_with_llm(call_text, previous=previous, temperature=self.sampling["temperature"]),
+            self.sampling["samples"],
+            self.sampling["quorum"],
+            slot=lambda: scheduler.slot(call_text),
+        )
+
+
+class LocalBackend(ClassifierBackend):
+    """CPU-only TF-IDF classifier trained on the labeled call log.
+
+    The model is loaded from `LOCAL_MODEL_FILE` if it exists and trained from
+    the call log otherwise. Predictions whose calibrated confidence does not
+    exceed `LOCAL_MIN_CONFIDENCE` are passed on to the next backend.
+    """
+
+    name = "local"
+
+    def __init__(self, model_file: str = None, min_confidence: int = None):
+        self.model_path = ROOT_DIR / (model_file or os.getenv("LOCAL_MODEL_FILE", "data/local_classifier.json"))
+        if min_confidence is None:
+            min_confidence = int(os.getenv("LOCAL_MIN_CONFIDENCE", "60"))
+        self.min_confidence = min_confidence
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> TfidfCentroidModel:
+        with self._lock:
+            if self._model is None:
+                if self.model_path.exists():
+                    self._model = TfidfCentroidModel.load(self.model_path)
+                else:
+                    self._model = TfidfCentroidModel.train(get_call_log_store().iter_calls())
+            return self._model
+
+    def classify(
+        self, call_text: str, on_update=None, previous: Optional[Classification] = None
+    ) -> Optional[Classification]:
+        prediction = self.model.predict(call_text)
+        if prediction is None:
+            return None
+        try:
+            result = Classification.from_dict(prediction)
+        except ClassificationError as e:
+            # A label in the training log that the pipeline does not know
+            logger.error(f"Local model returned an invalid classification: {e}")
+            return None
+        if result.confidence <= self.min_confidence:
+            return None
+        return keep_escalation(previous, result)
+
+
+class DegradedBackend(ClassifierBackend):
+    """Last resort when the LLM is down or its circuit is open.
+
+    Clear-cut transcripts are still classified by the keyword rules; anything
+    else is flagged for an operator at ORANGE, or RED if it has a RED trigger
+    word. Results are marked `degraded` and are never cached.
+    """
+
+    name = "degraded"
+
+    def classify(
+        self, call_text: str, on_update=None, previous: Optional[Classification] = None
+    ) -> Optional[Classification]:
+        # With the fast path on, the rules have already passed on this call
+        result = None if fast_path_enabled() else classify_by_rules(call_text)
+        if result is None:
+            result = Classification(
+                EmergencyPriority.RED if suspected_priority(call_text) == "RED" else EmergencyPriority.ORANGE,
+                previous.department if previous is not None else Department.POLICEDEPT,
+                "operator review",
+                0,
+            )
+        result = keep_escalation(previous, result)
+        logger.warning(f"Degraded classification: {result.priority.name}")
+        return Classification(result.priority, result.department, result.summary, result.confidence, degraded=True)
+
+
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    LocalBackend.name: LocalBackend,
+    DegradedBackend.name: DegradedBackend,
+}
+
+
+class BackendChain:
+    """Try each backend in order until one returns a classification."""
+
+    def __init__(self, backends: List[ClassifierBackend]):
+        self.backends = backends
+
+    def classify(self, call_text: str, on_update=None, previous: Optional[Classification] = None) -> Classification:
+        last_error = None
+        for backend in self.backends:
+            try:
+                result = backend.classify(call_text, on_update=on_update, previous=previous)
+            except Exception as e:
+                logger.error(f"Backend {backend.name} failed: {e}")
+                last_error = e
+                continue
+            if result is not None:
+                return result
+            logger.info(f"Backend {backend.name} passed on the call")
+        if last_error is not None:
+            raise last_error
+        raise RuntimeError("No classifier backend could classify the call")
+
+
+_chain: Optional[BackendChain] = None
+_chain_lock = threading.Lock()
+
+
+def get_backend_chain() -> BackendChain:
+    """Return the backend chain configured by `CLASSIFIER_BACKENDS`, e.g. "local,openai,degraded"."""
+    global _chain
+    with _chain_lock:
+        if _chain is None:
+            names = [n.strip() for n in os.getenv("CLASSIFIER_BACKENDS", "openai,degraded").split(",") if n.strip()]
+            unknown = [n for n in names if n not in BACKENDS]
+            if unknown:
+                raise ValueError(f"Unknown classifier backends: {unknown}")
+            _chain = BackendChain([BACKENDS[name]() for name in names])
+        return _chain
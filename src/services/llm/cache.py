@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from .result import Classification, ClassificationError
+
+logger = logging.getLogger(__name__)
+
+# Disfluencies and articles, which never change how a call should be triaged.
+# Words like "well", "gone" or "just" can ("he's not well", "she's gone"),
+# so they are kept.
+FILLER_WORDS = {"umm", "um", "uh", "uhh", "er", "erm", "hmm", "a", "an", "the"}
+
+_punctuation = re.compile(r"[^\w\s]")
+
+
+def normalize_transcript(call_text: str) -> str:
+    """Reduce a transcript to a cache key: lowercase, no punctuation or fillers."""
+    words = _punctuation.sub(" ", call_text.lower().replace("'", "")).split()
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+class ClassificationCache:
+    """Bounded LRU cache of classifications with a time-to-live.
+
+    Keys are normalized transcripts, so near-duplicate calls such as
+    "Umm, my dog is missing." and "My dog is missing!" share one entry.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600, path: Optional[Path] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if self.path:
+            self.load()
+
+    def get(self, call_text: str) -> Optional[Classification]:
+        key = normalize_transcript(call_text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, call_text: str, result: Classification):
+        key = normalize_transcript(call_text)
+        with self._lock:
+            # Classifications are never modified, so entries share the result
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def load(self):
+        """Warm the cache from disk, skipping entries that have expired."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error reading classification cache: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for key, stored_at, result in entries[-self.max_size:]:
+                if now - stored_at > self.ttl:
+                    continue
+                try:
+                    self._entries[key] = (stored_at, Classification.from_dict(result))
+                except ClassificationError as e:
+                    logger.error(f"Skipping invalid cached classification: {e}")
+        logger.info(f"Loaded {len(self._entries)} cached classifications from {self.path}")
+
+    def save(self):
+        """Write the cache to disk so a restart starts warm."""
+        if not self.path:
+            return
+        with self._lock:
+            entries = [[key, stored_at, result.to_dict()] for key, (stored_at, result) in self._entries.items()]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        tmp_path.replace(self.path)
+
+
+_cache: Optional[ClassificationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_classification_cache() -> Optional[ClassificationCache]:
+    """Return the shared cache, or None when caching is disabled."""
+    global _cache
+    if os.getenv("CLASSIFICATION_CACHE", "true").lower() not in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            cache_file = os.getenv("CLASSIFICATION_CACHE_FILE")
+            path = None
+            if cache_file:
+                path = Path(cache_file)
+                if not path.is_absolute():
+                    path = Path(__file__).parent.parent.parent.parent / path
+            _cache = ClassificationCache(
+                max_size=int(os.getenv("CLASSIFICATION_CACHE_SIZE", "1024")),
+                ttl=float(os.getenv("CLASSIFICATION_CACHE_TTL", "3600")),
+                path=path,
+            )
+            if path:
+                atexit.register(_cache.save)
+        return _cache
@@ -1,14 +1,25 @@
 import os
+import json
 import logging
+import threading
 from langchain_openai import ChatOpenAI
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
-from .prompt_templates import prompt_911
+from langchain_core.messages import HumanMessage
+from .prompt_templates import PROMPT_VARIANTS
+from .rules import classify_by_rules, fast_path_enabled, keep_escalation
+from .cache import get_classification_cache
+from .streaming import IncrementalFieldParser
+from .backends import get_backend_chain
+from .resilience import ResilientLLM, resilience_settings
+from .result import CLASSIFICATION_SCHEMA, Classification, ClassificationError
+from src.utils.metrics import stage
 
 logger = logging.getLogger(__name__)
 
 class LLMHandler:
     _instance = None
     _llm = None
+    _client = None
+    _client_lock = threading.Lock()
 
     @classmethod
     def get_llm(cls):
@@ -18,40 +29,188 @@ class LLMHandler:
                 logger.error("OpenAI API key not found in environment variables")
                 raise ValueError("OPENAI_API_KEY environment variable is not set")
             
-            cls._llm = ChatOpenAI(
-                model_name="gpt-4",
+            llm = ChatOpenAI(
+                model_name=os.getenv("OPENAI_MODEL", "gpt-4"),
                 api_key=api_key,
-                temperature=1.0,
+                # A classification is a few dozen tokens and should not vary between runs
+                temperature=float(os.getenv("LLM_TEMPERATURE", "0")),
+                max_tokens=int(os.getenv("LLM_MAX_TOKENS", "100")),
                 streaming=False,
+                # Retries and the overall deadline are handled by ResilientLLM
+                timeout=float(os.getenv("LLM_DEADLINE", "8")),
+                max_retries=0,
             )
+            cls._llm = bind_output_mode(llm, output_mode())
         return cls._llm
 
-# Define response schemas
-response_schemas = [
-    ResponseSchema(name="priority", description="The priority of the call"),
-    ResponseSchema(name="summary", description="A summary of the call"),
-    ResponseSchema(name="department", description="The department the call dispatched to"),
-    ResponseSchema(name="confidence", description="The confidence in the priority"),
-]
-output_parser = StructuredOutputParser.from_response_schemas(response_schemas)
-
-def process_emergency_call(call_text: str) -> dict:
-    """Process an emergency call and classify it."""
+    @classmethod
+    def get_client(cls) -> ResilientLLM:
+        """The LLM behind deadlines, retries, hedging and a circuit breaker."""
+        with cls._client_lock:
+            if cls._client is None:
+                cls._client = ResilientLLM(cls.get_llm(), **resilience_settings())
+            return cls._client
+
+    @classmethod
+    def client_stats(cls) -> dict:
+        client = cls._client
+        return client.stats() if client is not None else {"requests": 0, "circuit": "closed"}
+
+# How the model returns the classification: as the arguments of a forced
+# function call, as JSON constrained by a schema (needs a model with
+# structured outputs, e.g. gpt-4o), or as free text holding JSON
+OUTPUT_MODES = ("tools", "json_schema", "text")
+
+CLASSIFY_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "classify_call",
+        "description": "Record the triage classification of the call.",
+        "parameters": CLASSIFICATION_SCHEMA,
+    },
+}
+
+FORMAT_INSTRUCTIONS = {
+    "tools": "Call the classify_call function with your classification.",
+    "json_schema": "Answer with the classification only.",
+    "text": (
+        "Answer with only a JSON object matching this schema, without markdown:\n"
+        + json.dumps(CLASSIFICATION_SCHEMA)
+    ),
+}
+
+# The system message is static, so render each variant once at import
+SYSTEM_MESSAGES = {
+    mode: {
+        name: template.format(format_instructions=instructions)
+        for name, template in PROMPT_VARIANTS.items()
+    }
+    for mode, instructions in FORMAT_INSTRUCTIONS.items()
+}
+
+def output_mode() -> str:
+    mode = os.getenv("LLM_OUTPUT_MODE", "tools")
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown LLM_OUTPUT_MODE {mode!r}, expected one of {OUTPUT_MODES}")
+    return mode
+
+def bind_output_mode(llm, mode: str):
+    """Constrain the model's output to the classification schema."""
+    if mode == "tools":
+        return llm.bind_tools([CLASSIFY_TOOL], tool_choice=CLASSIFY_TOOL["function"]["name"])
+    if mode == "json_schema":
+        return llm.bind(response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "classification", "strict": True, "schema": CLASSIFICATION_SCHEMA},
+        })
+    return llm
+
+def build_messages(
+    call_text: str, variant: str = None, previous: Classification = None, mode: str = None
+) -> list:
+    """Messages for one call: the pre-rendered system message plus the transcript.
+
+    For a later turn of the same call, only the new utterance is sent, together
+    with the classification so far instead of the whole conversation.
+    """
+    variant = variant or os.getenv("PROMPT_VARIANT", "full")
+    if previous:
+        call_text = (
+            f"Classification of the call so far: {json.dumps(previous.to_dict())}\n"
+            f"The caller now says: {call_text}\n"
+            "Classify the whole call with this new information."
+        )
+    return [SYSTEM_MESSAGES[mode or output_mode()][variant], HumanMessage(content=call_text)]
+
+def streaming_enabled() -> bool:
+    return os.getenv("STREAMING_CLASSIFICATION", "false").lower() in ("1", "true", "yes")
+
+def stream_completion(llm, messages, on_update) -> str:
+    """Stream the completion, reporting each field as soon as it is parsed."""
+    parser = IncrementalFieldParser()
+    for chunk in llm.stream(messages):
+        # Tool call arguments stream as JSON text, just like a JSON completion
+        tool_call_chunks = getattr(chunk, "tool_call_chunks", None)
+        text = "".join(c.get("args") or "" for c in tool_call_chunks) if tool_call_chunks else chunk.content
+        new_fields = parser.feed(text)
+        if new_fields:
+            on_update(new_fields)
+    return parser.buffer
+
+def classify_with_llm(
+    call_text: str, on_update=None, previous: Classification = None, temperature: float = None, llm=None
+) -> Classification:
+    """Classify a call with the LLM alone, bypassing the rules and the cache.
+
+    `temperature` overrides the configured one, e.g. to draw varied samples.
+    `llm` replaces the resilient client, e.g. with the bare model for batch
+    tools that handle rate limits themselves.
+    """
     try:
         # Get the LLM instance lazily
-        llm = LLMHandler.get_llm()
+        llm = llm or LLMHandler.get_client()
         
+        with stage("prompt_format"):
+            messages = build_messages(call_text, previous=previous)
+
         # Get the response from the language model
-        response = llm.invoke(
-            prompt_911.format_messages(
-                call_text=call_text, 
-                format_instructions=output_parser.get_format_instructions()
-            )
-        )
+        streaming = on_update is not None and streaming_enabled()
+        with stage("llm_call"):
+            if streaming:
+                content = stream_completion(llm, messages, on_update)
+            else:
+                kwargs = {"temperature": temperature} if temperature is not None else {}
+                response = llm.invoke(messages, **kwargs)
 
-        # Parse the response
-        return output_parser.parse(response.content)
+        # Validate the response
+        with stage("parse"):
+            return Classification.from_json(content) if streaming else decode_response(response)
         
     except Exception as e:
         logger.error(f"Error processing call: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def decode_response(response) -> Classification:
+    """The classification in a model response, from its tool call or its content."""
+    tool_calls = getattr(response, "tool_calls", None)
+    if tool_calls:
+        return Classification.from_dict(tool_calls[0]["args"])
+    invalid_tool_calls = getattr(response, "invalid_tool_calls", None)
+    if invalid_tool_calls:
+        return Classification.from_json(invalid_tool_calls[0].get("args") or "")
+    if not response.content:
+        raise ClassificationError("The model returned no classification")
+    return Classification.from_json(response.content)
+
+def process_emergency_call(
+    call_text: str, on_update=None, previous: Classification = None, use_cache: bool = True
+) -> Classification:
+    """Process an emergency call and classify it.
+
+    If `on_update` is given and streaming is enabled, it is called with each
+    field of the classification as soon as it arrives from the model.
+    `previous` is the classification of the earlier turns of the same call.
+    Without `use_cache` the cache is neither read nor filled, e.g. for
+    partial transcripts that will not recur.
+    """
+    # Clear-cut transcripts are classified by keyword rules without the LLM
+    if fast_path_enabled():
+        with stage("rules"):
+            result = classify_by_rules(call_text)
+        if result is not None:
+            return keep_escalation(previous, result)
+
+    # Repeat and near-duplicate transcripts are served from the cache, but a
+    # later turn depends on the rest of the call, so it is never cached
+    cache = get_classification_cache() if previous is None and use_cache else None
+    if cache is not None:
+        with stage("cache_lookup"):
+            result = cache.get(call_text)
+        if result is not None:
+            return result
+
+    # The configured backends, e.g. a local model with the LLM as fallback
+    result = get_backend_chain().classify(call_text, on_update=on_update, previous=previous)
+    if cache is not None and not result.degraded:
+        cache.put(call_text, result)
+    return result
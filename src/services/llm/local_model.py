@@ -0,0 +1,207 @@
+import re
+import json
+import math
+import logging
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_word = re.compile(r"[a-z0-9']+")
+
+# Words that say nothing about the emergency. Negations are kept, since
+# "no one is hurt" and "someone is hurt" must not look alike.
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "but", "so", "if", "then", "of", "to", "in",
+    "on", "at", "by", "for", "from", "with", "about", "as", "into", "there",
+    "here", "is", "are", "was", "were", "be", "been", "being", "am", "im",
+    "its", "it", "this", "that", "these", "those", "i", "me", "my", "we", "us",
+    "our", "you", "your", "he", "him", "his", "she", "her", "they", "them",
+    "their", "have", "has", "had", "do", "does", "did", "can", "could", "will",
+    "would", "please", "hello", "hi", "yes", "okay", "ok", "um", "umm", "uh",
+    "er", "hmm",
+}
+
+# Placeholder the degraded backend gives calls it could not classify
+PLACEHOLDER_SUMMARY = "operator review"
+
+# Held-out folds used to calibrate confidence
+CALIBRATION_FOLDS = 5
+
+
+def tokenize(text: str) -> list:
+    """Unigrams and bigrams of the lowercased transcript, without stop words."""
+    words = [w for w in (w.replace("'", "") for w in _word.findall(text.lower())) if w not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def is_training_example(call: dict) -> bool:
+    """Whether a logged call carries a real label to learn from.
+
+    Degraded results are guesses made while the LLM was unavailable, so
+    they are left out along with the operator review placeholder.
+    """
+    return bool(
+        call.get("call_text")
+        and call.get("priority")
+        and not call.get("degraded")
+        and call.get("summary") != PLACEHOLDER_SUMMARY
+    )
+
+
+class TfidfCentroidModel:
+    """TF-IDF nearest-centroid classifier for priority and department.
+
+    Each label is represented by the normalized mean TF-IDF vector of its
+    training transcripts, so prediction is one sparse dot product per label.
+
+    Confidence is calibrated on held-out folds of the training calls: the
+    margin between the best and second-best priority scores is mapped to how
+    often predictions with that margin were right. A transcript that shares a
+    single word with one centroid has a small margin and so a low confidence.
+    """
+
+    def __init__(self, idf: dict, centroids: dict, calibration: list = None):
+        self.idf = idf
+        # {"priority": {"RED": {term: weight}}, "department": {...}}
+        self.centroids = centroids
+        # [[lowest margin, accuracy], ...] in increasing order of margin
+        self.calibration = calibration or []
+        # Words never seen in training weigh as much as the rarest known ones
+        self.unseen_idf = max(idf.values(), default=1.0)
+
+    @classmethod
+    def train(cls, calls: Iterable[dict]) -> "TfidfCentroidModel":
+        documents = [
+            (Counter(tokenize(call["call_text"])), call) for call in calls if is_training_example(call)
+        ]
+        if not documents:
+            raise ValueError("No labeled calls to train on")
+        model = cls._fit(documents)
+        model.calibration = _calibrate(documents)
+        logger.info(f"Trained local classifier on {len(documents)} calls")
+        return model
+
+    @classmethod
+    def _fit(cls, documents: list) -> "TfidfCentroidModel":
+
+        document_frequency = Counter()
+        for counts, _ in documents:
+            document_frequency.update(counts.keys())
+        idf = {
+            term: math.log((1 + len(documents)) / (1 + df)) + 1
+            for term, df in document_frequency.items()
+        }
+
+        centroids = {}
+        for field in ("priority", "department"):
+            sums = defaultdict(Counter)
+            for counts, call in documents:
+                label = call.get(field)
+                if label:
+                    for term, weight in _tfidf(counts, idf).items():
+                        sums[label][term] += weight
+            centroids[field] = {label: _normalize(vector) for label, vector in sums.items()}
+        return cls(idf, centroids)
+
+    def _scores(self, call_text: str) -> Optional[tuple]:
+        counts = Counter(tokenize(call_text))
+        if not any(term in self.idf for term in counts):
+            return None
+        # Unknown words stay in the vector, so a transcript that shares one
+        # word with a centroid scores lower than one made of known words
+        vector = _normalize(_tfidf(counts, self.idf, self.unseen_idf))
+        scores = {
+            field: {
+                label: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+                for label, centroid in centroids.items()
+            }
+            for field, centroids in self.centroids.items()
+        }
+        return vector, scores
+
+    def predict(self, call_text: str) -> Optional[dict]:
+        """Classify a transcript, or return None if no known words appear in it."""
+        scored = self._scores(call_text)
+        if scored is None:
+            return None
+        vector, scores = scored
+        result = {field: max(field_scores, key=field_scores.get) for field, field_scores in scores.items()}
+        # Summarize with the most distinctive words of the transcript
+        top_terms = sorted((term for term in vector if " " not in term), key=vector.get, reverse=True)[:3]
+        result["summary"] = " ".join(top_terms)
+        result["confidence"] = str(round(100 * self.confidence(_margin(scores["priority"]))))
+        return result
+
+    def confidence(self, margin: float) -> float:
+        """Held-out accuracy of priority predictions with this score margin."""
+        accuracy = 0.0
+        for lowest, block_accuracy in self.calibration:
+            if margin < lowest:
+                break
+            accuracy = block_accuracy
+        return accuracy
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"idf": self.idf, "centroids": self.centroids, "calibration": self.calibration}, f)
+
+    @classmethod
+    def load(cls, path: Path) -> "TfidfCentroidModel":
+        with open(path, "r") as f:
+            data = json.load(f)
+        if "calibration" not in data:
+            logger.warning(f"{path} has no confidence calibration; retrain it with src.tools.train_local_model")
+        return cls(data["idf"], data["centroids"], data.get("calibration"))
+
+
+def _margin(scores: dict) -> float:
+    best, second = (sorted(scores.values(), reverse=True) + [0.0, 0.0])[:2]
+    return best - second
+
+
+def _calibrate(documents: list) -> list:
+    """Map priority score margins to held-out accuracy.
+
+    Each fold is predicted by a model trained on the other folds. The
+    outcomes, ordered by margin, are pooled until accuracy never falls as
+    the margin grows, and each block's accuracy is smoothed towards 1/2 so
+    a handful of lucky predictions cannot claim certainty.
+    """
+    folds = min(CALIBRATION_FOLDS, len(documents))
+    outcomes = []
+    for fold in range(folds):
+        held_out = documents[fold::folds]
+        training = [document for i, document in enumerate(documents) if i % folds != fold]
+        if not training:
+            continue
+        model = TfidfCentroidModel._fit(training)
+        for _, call in held_out:
+            scored = model._scores(call["call_text"])
+            if scored is None:
+                outcomes.append((0.0, False))
+                continue
+            scores = scored[1]["priority"]
+            outcomes.append((_margin(scores), max(scores, key=scores.get) == call["priority"]))
+    outcomes.sort()
+
+    # Pool adjacent violators: [lowest margin, correct, total] per block
+    blocks = []
+    for margin, correct in outcomes:
+        blocks.append([margin, int(correct), 1])
+        while len(blocks) > 1 and blocks[-2][1] * blocks[-1][2] >= blocks[-1][1] * blocks[-2][2]:
+            _, correct, total = blocks.pop()
+            blocks[-1][1] += correct
+            blocks[-1][2] += total
+    return [[margin, (correct + 1) / (total + 2)] for margin, correct, total in blocks]
+
+
+def _tfidf(counts: Counter, idf: dict, unseen_idf: float = None) -> dict:
+    return {term: (1 + math.log(count)) * idf.get(term, unseen_idf) for term, count in counts.items()}
+
+
+def _normalize(vector: dict) -> dict:
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else vector
@@ -0,0 +1,304 @@
+import os
+import time
+import queue
+import random
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_END_OF_STREAM = object()
+
+
+class CircuitOpenError(RuntimeError):
+    """The LLM is failing too often to be worth calling right now."""
+
+
+class CircuitBreaker:
+    """Stops calling the LLM while its recent error rate is too high.
+
+    Outcomes are kept for the last `window` seconds. Once at least
+    `min_requests` of them are recorded and the share of failures reaches
+    `failure_rate`, the circuit opens and calls fail fast for `cooldown`
+    seconds. After that a single trial call is let through: success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, min_requests: int = 10, window: float = 30, cooldown: float = 15):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._outcomes = deque()
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "half_open":
+                self._trial_in_flight = False
+                self._outcomes.clear()
+                if ok:
+                    self.state = "closed"
+                    logger.info("LLM circuit closed")
+                else:
+                    self._open(now)
+                return
+
+            self._outcomes.append((now, ok))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, succeeded in self._outcomes if not succeeded)
+            if (
+                self.state == "closed"
+                and len(self._outcomes) >= self.min_requests
+                and failures >= self.failure_rate * len(self._outcomes)
+            ):
+                self._open(now)
+
+    def _open(self, now: float):
+        self.state = "open"
+        self._opened_at = now
+        logger.error(f"LLM circuit open for {self.cooldown:g}s")
+
+
+class ResilientLLM:
+    """Deadlines, retries and hedging around a chat model.
+
+    Each `invoke` has `deadline` seconds in total. A failed or timed-out
+    attempt is retried up to `retries` times after a jittered exponential
+    backoff, as long as the deadline allows. If an attempt is still running
+    once it is slower than the `hedge_percentile` of recent latencies, a
+    duplicate request is sent and whichever answers first wins. Outcomes feed
+    a circuit breaker, and while it is open calls fail with `CircuitOpenError`
+    so the caller can fall back to a degraded classifier.
+
+    Every request, including hedges, retries and attempts abandoned at the
+    deadline, runs on one of `max_workers` pool threads. Sized to
+    `LLM_MAX_IN_FLIGHT`, the pool caps real traffic to the provider even
+    after the caller has given up on a request; extra requests wait for a
+    thread, and those still waiting when their attempt ends are cancelled.
+    """
+
+    def __init__(
+        self,
+        llm,
+        deadline: float = 8.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        hedge_percentile: float = 95,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 32,
+    ):
+        self.llm = llm
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        # Abandoned attempts keep a worker until the HTTP timeout ends them
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        # Requests open with the provider right now
+        self.in_flight = 0
+        self._stats = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "rejected": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before hedging, or None until enough latencies are known."""
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            return float(np.percentile(self._latencies, self.hedge_percentile))
+
+    def _submit(self, messages, kwargs: dict):
+        # Run in a copy of the caller's context so trace spans stay nested
+        return self._pool.submit(contextvars.copy_context().run, self._timed_invoke, messages, kwargs)
+
+    def _timed_invoke(self, messages, kwargs: dict):
+        self._track(1)
+        try:
+            started = time.perf_counter()
+            response = self.llm.invoke(messages, **kwargs)
+            with self._lock:
+                self._latencies.append(time.perf_counter() - started)
+            return response
+        finally:
+            self._track(-1)
+
+    def _track(self, change: int):
+        with self._lock:
+            self.in_flight += change
+
+    def _attempt(self, messages, remaining: float, kwargs: dict):
+        """One attempt, hedged if it runs long; raises TimeoutError past `remaining`."""
+        started = time.perf_counter()
+        ends = started + remaining
+        hedge_after = self.hedge_delay()
+        hedge_at = started + hedge_after if hedge_after is not None else None
+        pending = {self._submit(messages, kwargs)}
+        try:
+            return self._race(messages, kwargs, pending, hedge_at, ends, remaining)
+        finally:
+            # Requests still waiting for a pool thread are not sent at all
+            for future in pending:
+                future.cancel()
+
+    def _race(self, messages, kwargs: dict, pending: set, hedge_at: Optional[float], ends: float, remaining: float):
+        hedge = None
+        error = None
+        while pending:
+            wake = ends if hedge is not None or hedge_at is None else min(ends, hedge_at)
+            done, _ = wait(pending, timeout=max(0.0, wake - time.perf_counter()), return_when=FIRST_COMPLETED)
+            # Updated in place, so the caller can cancel what is left
+            pending -= done
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    self._count("hedge_wins")
+                return response
+            now = time.perf_counter()
+            if now >= ends:
+                break
+            if pending and hedge is None and hedge_at is not None and now >= hedge_at:
+                # Slower than usual: race a duplicate request
+                hedge = self._submit(messages, kwargs)
+                pending.add(hedge)
+                self._count("hedges")
+        if not pending:
+            raise error
+        self._count("timeouts")
+        raise TimeoutError(f"No LLM response within {remaining:.1f}s")
+
+    def invoke(self, messages, **kwargs):
+        """Invoke the model; `kwargs`, e.g. a temperature, are passed on to it."""
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError("LLM circuit is open")
+        self._count("requests")
+        ends = time.perf_counter() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                response = self._attempt(messages, ends - time.perf_counter(), kwargs)
+            except Exception as e:
+                # Full jitter keeps retries from many calls from arriving together
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                if attempt >= self.retries or time.perf_counter() + delay >= ends:
+                    self.breaker.record(False)
+                    raise
+                logger.warning(f"LLM attempt {attempt + 1} failed, retrying in {delay:.2f}s: {e}")
+                self._count("retries")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record(True)
+            return response
+
+    def stream(self, messages):
+        """Stream a completion; not retried or hedged once chunks have been sent on.
+
+        Chunks are read on a pool thread, and the whole stream must finish
+        within `deadline` or TimeoutError is raised. A stream the caller
+        stops reading early counts as a failure for the circuit breaker.
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError("LLM circuit is open")
+        self._count("requests")
+        ends = time.perf_counter() + self.deadline
+        chunks = queue.Queue()
+        abandoned = threading.Event()
+
+        def read():
+            if abandoned.is_set():
+                return
+            self._track(1)
+            try:
+                for chunk in self.llm.stream(messages):
+                    if abandoned.is_set():
+                        return
+                    chunks.put((True, chunk))
+                chunks.put((True, _END_OF_STREAM))
+            except Exception as e:
+                chunks.put((False, e))
+            finally:
+                self._track(-1)
+
+        # Run in a copy of the caller's context so trace spans stay nested
+        self._pool.submit(contextvars.copy_context().run, read)
+        ok = False
+        try:
+            while True:
+                try:
+                    succeeded, item = chunks.get(timeout=max(0.0, ends - time.perf_counter()))
+                except queue.Empty:
+                    self._count("timeouts")
+                    raise TimeoutError(f"LLM stream did not finish within {self.deadline:.1f}s")
+                if not succeeded:
+                    raise item
+                if item is _END_OF_STREAM:
+                    break
+                yield item
+            ok = True
+        finally:
+            abandoned.set()
+            self.breaker.record(ok)
+
+    def stats(self) -> dict:
+        hedge_delay = self.hedge_delay()
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": self.in_flight,
+                "circuit": self.breaker.state,
+                "hedge_delay": hedge_delay,
+            }
+
+
+def resilience_settings() -> dict:
+    """Keyword arguments for `ResilientLLM` from the environment."""
+    return {
+        "deadline": float(os.getenv("LLM_DEADLINE", "8")),
+        "retries": int(os.getenv("LLM_RETRIES", "2")),
+        "backoff": float(os.getenv("LLM_RETRY_BACKOFF", "0.2")),
+        "hedge_percentile": float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+        "hedge_min_samples": int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+        "breaker": CircuitBreaker(
+            failure_rate=float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5")),
+            min_requests=int(os.getenv("LLM_BREAKER_MIN_REQUESTS", "10")),
+            window=float(os.getenv("LLM_BREAKER_WINDOW", "30")),
+            cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "15")),
+        ),
+        # One thread per request the provider may see at once
+        "max_workers": int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+    }
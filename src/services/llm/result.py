@@ -0,0 +1,142 @@
+import json
+from enum import IntEnum
+
+
+class EmergencyPriority(IntEnum):
+    # Lower values are more urgent
+    RED = 1
+    ORANGE = 2
+    GREEN = 3
+
+
+class Department(IntEnum):
+    POLICEDEPT = 1
+    FIRDEPT = 2
+    EMS = 3
+    # The spelling used by the old call processor
+    FIREDEPT = 2
+
+
+# JSON schema of a classification, for the provider's structured output modes
+CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "priority": {"type": "string", "enum": [priority.name for priority in EmergencyPriority]},
+        "summary": {"type": "string", "description": "About three words"},
+        "department": {"type": "string", "enum": [department.name for department in Department]},
+        "confidence": {"type": "integer", "description": "0-100, your confidence in the priority"},
+    },
+    "required": ["priority", "summary", "department", "confidence"],
+    "additionalProperties": False,
+}
+
+
+class ClassificationError(ValueError):
+    """A classifier returned something that is not a valid classification."""
+
+
+def parse_confidence(value) -> int:
+    """Confidence as an integer percentage, from 90, "90", "90%" or "0.9"."""
+    try:
+        text = str(value).strip().rstrip("%")
+        confidence = float(text)
+    except (TypeError, ValueError):
+        raise ClassificationError(f"Invalid confidence: {value!r}")
+    if "." in text and confidence <= 1:
+        confidence *= 100
+    return max(0, min(100, round(confidence)))
+
+
+class Classification:
+    """A validated classification of a call.
+
+    Priority and department are enum members and confidence is an integer, so
+    consumers never re-check the fields. Instances are not modified after
+    they are built, which lets the cache and call sessions share them.
+    """
+
+    __slots__ = ("priority", "department", "summary", "confidence", "degraded")
+
+    def __init__(
+        self,
+        priority: EmergencyPriority,
+        department: Department,
+        summary: str,
+        confidence: int,
+        degraded: bool = False,
+    ):
+        self.priority = priority
+        self.department = department
+        self.summary = summary
+        self.confidence = confidence
+        self.degraded = degraded
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Classification":
+        """Validate a classifier's output.
+
+        A missing department falls back to POLICEDEPT, which the prompt names
+        as the department for everything not medical or fire related.
+        """
+        try:
+            priority = EmergencyPriority[str(data["priority"]).strip().upper()]
+        except KeyError:
+            raise ClassificationError(f"Invalid priority: {data.get('priority')!r}")
+        department = data.get("department")
+        if department:
+            try:
+                department = Department[str(department).strip().upper()]
+            except KeyError:
+                raise ClassificationError(f"Invalid department: {department!r}")
+        else:
+            department = Department.POLICEDEPT
+        return cls(
+            priority,
+            department,
+            str(data.get("summary") or ""),
+            parse_confidence(data.get("confidence")),
+            bool(data.get("degraded", False)),
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "Classification":
+        """Decode a model completion: a JSON object, optionally in a ```json fence."""
+        text = text.strip()
+        if text.startswith("```"):
+            text = text[text.find("\n") + 1 : text.rfind("```")]
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            # Fall back to the outermost braces when the model added prose
+            start, end = text.find("{"), text.rfind("}")
+            try:
+                data = json.loads(text[start : end + 1]) if start != -1 else None
+            except json.JSONDecodeError:
+                data = None
+        if not isinstance(data, dict):
+            raise ClassificationError(f"Completion is not a JSON object: {text[:200]!r}")
+        return cls.from_dict(data)
+
+    def with_priority(self, priority: EmergencyPriority) -> "Classification":
+        return Classification(priority, self.department, self.summary, self.confidence, self.degraded)
+
+    def to_dict(self) -> dict:
+        """The wire format used for the call log, the dashboard and TwiML."""
+        result = {
+            "priority": self.priority.name,
+            "summary": self.summary,
+            "department": self.department.name,
+            "confidence": self.confidence,
+        }
+        if self.degraded:
+            result["degraded"] = True
+        return result
+
+    def __eq__(self, other):
+        if not isinstance(other, Classification):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Classification({self.to_dict()})"
+
@@ -0,0 +1,142 @@
+import os
+import re
+import logging
+import threading
+from collections import Counter
+from typing import Optional
+from .result import Classification, Department, EmergencyPriority
+
+logger = logging.getLogger(__name__)
+
+# (priority, department, pattern) - the trigger vocabulary from the system prompt.
+# A department of None marks words that signal urgency but not who to send.
+RULES = [
+    ("RED", "POLICEDEPT", r"guns?|shot|shoot(?:ing|er)|knife|stabb(?:ed|ing)|coming after me"),
+    ("RED", "POLICEDEPT", r"break(?:ing)? in(?:to)?|broke in(?:to)?|kidnapp(?:ed|ing)"),
+    ("RED", "EMS", r"bleeding|blood\s+everywhere|not breathing|unconscious|heart attack"),
+    ("RED", "EMS", r"overdos(?:e|ed|ing)|dying|choking"),
+    ("RED", "FIRDEPT", r"on fire|burning|explosion|flames"),
+    ("RED", None, r"please help|help me"),
+    ("GREEN", "POLICEDEPT", r"noise complaint|loud music|barking"),
+    ("GREEN", "POLICEDEPT", r"lost (?:my|our) (?:cat|dog|pet)"),
+    ("GREEN", "POLICEDEPT", r"(?:cat|dog|kitten|puppy|pet)\b[\w\s']{0,20}?\b(?:missing|lost|stuck)"),
+]
+
+# One alternation with a named group per rule, so a single scan finds every hit
+_pattern = re.compile(
+    "|".join(rf"(?P<r{i}>\b(?:{rule[2]})\b)" for i, rule in enumerate(RULES)),
+    re.IGNORECASE,
+)
+
+# Trigger words with everyday meanings ("flu shot", "my phone is dying",
+# "my eyes are burning"); they raise the suspected priority but never
+# classify a call on their own
+AMBIGUOUS_TERMS = {"shot", "dying", "burning"}
+
+# A trigger word with one of these among the NEGATION_WINDOW words before
+# it is negated ("there is no gun", "nobody is bleeding")
+NEGATIONS = {
+    "no", "not", "never", "nobody", "nothing", "without", "isnt", "wasnt",
+    "arent", "werent", "dont", "doesnt", "didnt", "aint", "hasnt", "havent",
+}
+NEGATION_WINDOW = 3
+
+_word = re.compile(r"[a-z']+")
+
+
+def _matches(call_text: str):
+    """Yield (rule, term, negated) for each trigger word in the transcript."""
+    for match in _pattern.finditer(call_text):
+        before = _word.findall(call_text[:match.start()].lower())[-NEGATION_WINDOW:]
+        negated = any(word.replace("'", "") in NEGATIONS for word in before)
+        yield RULES[int(match.lastgroup[1:])], match.group().lower(), negated
+
+_stats_lock = threading.Lock()
+_stats = {"short_circuited": 0, "fallback": 0}
+
+
+def _record(outcome: str):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def get_rule_stats() -> dict:
+    """Counts of calls answered by the rules versus passed on to the LLM."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def fast_path_enabled() -> bool:
+    """Whether rules classify clear-cut transcripts before any other classifier."""
+    return os.getenv("RULES_FAST_PATH", "true").lower() in ("1", "true", "yes")
+
+
+def classify_by_rules(call_text: str) -> Optional[Classification]:
+    """Classify clear-cut transcripts without the LLM.
+
+    Returns None when the transcript is ambiguous and should go to the model,
+    including when a trigger word is negated or has an everyday meaning.
+    """
+    priorities = set()
+    departments = Counter()
+    terms = []
+    for (priority, department, _), term, negated in _matches(call_text):
+        if negated or term in AMBIGUOUS_TERMS:
+            _record("fallback")
+            return None
+        priorities.add(priority)
+        if department:
+            departments[department] += 1
+        if term not in terms:
+            terms.append(term)
+
+    # Conflicting priorities or no clear department: let the LLM decide
+    if len(priorities) != 1 or not departments:
+        _record("fallback")
+        return None
+
+    priority = priorities.pop()
+    if priority != "RED" and len(departments) > 1:
+        _record("fallback")
+        return None
+
+    # Counter.most_common keeps first-seen order on ties
+    department = departments.most_common(1)[0][0]
+    _record("short_circuited")
+    logger.info(f"Rules classified call as {priority}/{department}: {terms}")
+    return Classification(
+        EmergencyPriority[priority],
+        Department[department],
+        " ".join(terms),
+        95 if len(departments) == 1 else 80,
+    )
+
+
+# Scheduling rank of each suspected priority, most urgent first
+PRIORITY_RANK = {"RED": 0, "ORANGE": 1, "GREEN": 2}
+
+
+def suspected_priority(call_text: str) -> str:
+    """Cheap guess at the priority, used to order work before classification.
+
+    Any RED trigger word that is not negated makes the call suspected RED;
+    calls with only GREEN vocabulary are suspected GREEN, and everything else
+    ORANGE.
+    """
+    priorities = {rule[0] for rule, _, negated in _matches(call_text) if not negated}
+    if "RED" in priorities:
+        return "RED"
+    if priorities == {"GREEN"}:
+        return "GREEN"
+    return "ORANGE"
+
+
+def keep_escalation(previous: Optional[Classification], result: Classification) -> Classification:
+    """Never let a later turn of the same call lower its priority.
+
+    Used for the rule and local classifiers, which only see the newest
+    utterance; the LLM sees the previous classification and decides itself.
+    """
+    if previous is not None and previous.priority < result.priority:
+        return result.with_priority(previous.priority)
+    return result
@@ -0,0 +1,109 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from .rules import PRIORITY_RANK, suspected_priority
+
+
+class ClassificationScheduler:
+    """Caps in-flight LLM requests and hands free slots out by suspected priority.
+
+    Callers block in `slot` until one of `max_in_flight` slots is free and no
+    more urgent caller is waiting, so suspected-RED transcripts reach the
+    model before likely-GREEN ones. Ties are served first come, first served.
+    A caller that waits longer than `timeout` seconds gets a TimeoutError,
+    so the backend chain can fall through to the next backend.
+    """
+
+    def __init__(self, max_in_flight: int = 8, timeout: float = None):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiting = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._stats = {
+            priority: {"waiting": 0, "completed": 0, "timed_out": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for priority in PRIORITY_RANK
+        }
+
+    @contextmanager
+    def slot(self, call_text: str):
+        priority = suspected_priority(call_text)
+        self.acquire(priority)
+        try:
+            yield priority
+        finally:
+            self.release()
+
+    def acquire(self, priority: str):
+        ticket = (PRIORITY_RANK[priority], next(self._order))
+        started = time.perf_counter()
+        deadline = None if self.timeout is None else started + self.timeout
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            self._stats[priority]["waiting"] += 1
+            while self.in_flight >= self.max_in_flight or self._waiting[0] != ticket:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._stats[priority]["waiting"] -= 1
+                    self._stats[priority]["timed_out"] += 1
+                    # The caller behind this one may now be first in line
+                    self._condition.notify_all()
+                    raise TimeoutError(f"No LLM slot free after {self.timeout}s")
+                self._condition.wait(remaining)
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+
+            waited = time.perf_counter() - started
+            stats = self._stats[priority]
+            stats["waiting"] -= 1
+            stats["completed"] += 1
+            stats["total_wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+            # The next waiter may be able to go too
+            self._condition.notify_all()
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """Queue depth and wait times (seconds) per suspected priority."""
+        with self._condition:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "priorities": {
+                    priority: {
+                        "waiting": stats["waiting"],
+                        "completed": stats["completed"],
+                        "timed_out": stats["timed_out"],
+                        "mean_wait": stats["total_wait"] / stats["completed"] if stats["completed"] else 0.0,
+                        "max_wait": stats["max_wait"],
+                    }
+                    for priority, stats in self._stats.items()
+                },
+            }
+
+
+_scheduler: Optional[ClassificationScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> ClassificationScheduler:
+    """Return the shared scheduler, configured from the environment on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ClassificationScheduler(
+                max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+                timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "10")),
+            )
+        return _scheduler
@@ -0,0 +1,57 @@
+import re
+from .result import ClassificationError, parse_confidence
+
+FIELDS = ("priority", "summary", "department", "confidence")
+PRIORITIES = ("RED", "ORANGE", "GREEN")
+
+# A completed "key": "value" (or bare number) pair in the partial completion
+_field = re.compile(
+    r'"(?P<key>' + "|".join(FIELDS) + r')"\s*:\s*(?:"(?P<text>(?:[^"\\]|\\.)*)"|(?P<number>\d+)\s*[,}\n])'
+)
+# The opening letters of the priority value, before its closing quote arrives
+_priority_prefix = re.compile(r'"priority"\s*:\s*"(?P<prefix>[A-Za-z]+)')
+
+
+class IncrementalFieldParser:
+    """Pull classification fields out of a JSON completion as it streams in.
+
+    Each call to `feed` returns only the fields that became known with that
+    chunk, so they can be pushed to the dashboard straight away. The priority
+    is reported as soon as its first letter uniquely identifies it, and the
+    confidence as an integer, as in the final classification.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+
+    def feed(self, chunk: str) -> dict:
+        self.buffer += chunk
+        new_fields = {}
+
+        if "priority" not in self.fields:
+            match = _priority_prefix.search(self.buffer)
+            if match:
+                prefix = match.group("prefix").upper()
+                candidates = [p for p in PRIORITIES if p.startswith(prefix)]
+                if len(candidates) == 1:
+                    new_fields["priority"] = candidates[0]
+
+        for match in _field.finditer(self.buffer):
+            key = match.group("key")
+            if key in self.fields or key in new_fields:
+                continue
+            value = match.group("text")
+            if value is None:
+                value = match.group("number")
+            value = value.replace('\\"', '"')
+            if key == "confidence":
+                try:
+                    value = parse_confidence(value)
+                except ClassificationError:
+                    # Left for the final classification to reject
+                    continue
+            new_fields[key] = value
+
+        self.fields.update(new_fields)
+        return new_fields
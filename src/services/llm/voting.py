@@ -0,0 +1,112 @@
+import os
+import logging
+import threading
+import contextvars
+from collections import Counter
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+from typing import Callable, ContextManager, List, Optional
+from .result import Classification
+
+logger = logging.getLogger(__name__)
+
+
+def sampling_settings() -> dict:
+    """Number of samples, quorum and sampling temperature from the environment.
+
+    With `LLM_SAMPLES` of 1 (the default) every call gets a single sample.
+    The quorum defaults to a majority of the samples.
+    """
+    samples = max(1, int(os.getenv("LLM_SAMPLES", "1")))
+    quorum = int(os.getenv("LLM_QUORUM", "0")) or samples // 2 + 1
+    return {
+        "samples": samples,
+        "quorum": min(quorum, samples),
+        "temperature": float(os.getenv("LLM_SAMPLE_TEMPERATURE", "0.7")),
+    }
+
+
+def aggregate(votes: List[Classification], samples: Optional[int] = None) -> Classification:
+    """Majority vote over sampled classifications.
+
+    Ties go to the more urgent priority. The department is the most common one
+    among the samples for the winning priority, the summary comes from the
+    most confident of them, and the confidence is the share of the `samples`
+    requested (all votes by default) that agree on the priority. When the
+    vote stops early at a quorum, this is a lower bound.
+    """
+    counts = Counter(vote.priority for vote in votes)
+    # EmergencyPriority is ordered most urgent first
+    priority = min(counts, key=lambda p: (-counts[p], p))
+    winners = [vote for vote in votes if vote.priority == priority]
+    department = Counter(vote.department for vote in winners).most_common(1)[0][0]
+    summary = max(winners, key=lambda vote: vote.confidence).summary
+    return Classification(priority, department, summary, round(100 * len(winners) / (samples or len(votes))))
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=4 * int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+                thread_name_prefix="llm-sample",
+            )
+        return _pool
+
+
+def classify_by_vote(
+    sample: Callable[[], Classification],
+    samples: int,
+    quorum: int,
+    slot: Callable[[], ContextManager] = nullcontext,
+) -> Classification:
+    """Run `sample` `samples` times concurrently and aggregate the results.
+
+    Each sample runs inside its own `slot()`, e.g. a scheduler slot, so every
+    request counts against the in-flight cap. Returns as soon as `quorum`
+    samples agree on the priority; the slower samples are abandoned, and those
+    still waiting for a slot then are skipped. Failed samples do not vote, and
+    if every sample fails the last error is raised.
+    """
+    pool = _get_pool()
+    decided = threading.Event()
+
+    def run() -> Classification:
+        with slot():
+            if decided.is_set():
+                raise CancelledError()
+            return sample()
+
+    # Each sample runs in a copy of the caller's context so trace spans stay nested
+    pending = {pool.submit(contextvars.copy_context().run, run) for _ in range(samples)}
+    votes = []
+    error = None
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    votes.append(future.result())
+                except Exception as e:
+                    logger.error(f"Classification sample failed: {e}")
+                    error = e
+            if votes and Counter(vote.priority for vote in votes).most_common(1)[0][1] >= quorum:
+                break
+    finally:
+        decided.set()
+        for future in pending:
+            future.cancel()
+
+    if not votes:
+        raise error
+    result = aggregate(votes, samples)
+    logger.info(
+        f"{len(votes)} of {samples} samples voted {result.priority.name} "
+        f"with {result.confidence}% agreement"
+    )
+    return result
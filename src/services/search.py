@@ -0,0 +1,141 @@
+import os
+import re
+import queue
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+from src.utils.storage import ROOT_DIR, get_call_log_store
+
+logger = logging.getLogger(__name__)
+
+_term = re.compile(r"\w+")
+
+
+class CallSearchIndex:
+    """SQLite FTS5 index over call transcripts and summaries.
+
+    The index is a file next to the call log. It remembers how many log
+    entries it holds, so a restart only indexes calls saved since. Saved
+    calls are queued and written by a background thread, many rows per
+    transaction, so neither the replay nor a save waits on SQLite.
+    """
+
+    def __init__(self, db_path: Path, batch_size: int = 1000):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS calls USING fts5("
+                "call_text, summary, timestamp UNINDEXED, priority UNINDEXED, "
+                "department UNINDEXED, confidence UNINDEXED, tokenize='porter unicode61')"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'indexed'").fetchone()
+        self.indexed = row[0] if row else 0
+        self.batch_size = batch_size
+        # Bounded, so a replay of a large log does not outrun the writer
+        self._queue = queue.Queue(maxsize=10 * batch_size)
+        threading.Thread(target=self._write_batches, name="search-indexer", daemon=True).start()
+
+    def on_call_saved(self, call: dict):
+        """Call log listener: queue the entry for the indexer thread."""
+        self._queue.put(call)
+
+    def _write_batches(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._insert(batch)
+            except Exception as e:
+                logger.error(f"Error indexing {len(batch)} calls: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _insert(self, calls: list):
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        call.get("call_text", ""),
+                        call.get("summary", ""),
+                        call.get("timestamp"),
+                        call.get("priority"),
+                        call.get("department"),
+                        str(call.get("confidence", "")),
+                    )
+                    for call in calls
+                ],
+            )
+            self._db.execute(
+                "INSERT INTO meta VALUES ('indexed', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (self.indexed + len(calls),),
+            )
+        self.indexed += len(calls)
+
+    def flush(self):
+        """Wait until every queued call is indexed."""
+        self._queue.join()
+
+    def search(self, query: str, page: int = 1, per_page: int = 20) -> dict:
+        """Calls matching every word of `query`, best matches first."""
+        terms = _term.findall(query)
+        result = {"query": query, "page": page, "per_page": per_page, "total": 0, "results": []}
+        if not terms:
+            return result
+        # Quote each word so user input is never parsed as FTS5 syntax
+        match = " ".join(f'"{term}"' for term in terms)
+        offset = (page - 1) * per_page
+
+        with self._lock:
+            result["total"] = self._db.execute(
+                "SELECT count(*) FROM calls WHERE calls MATCH ?", (match,)
+            ).fetchone()[0]
+            rows = self._db.execute(
+                "SELECT timestamp, call_text, summary, priority, department, confidence, "
+                "snippet(calls, -1, '[', ']', '...', 12), bm25(calls) AS rank "
+                "FROM calls WHERE calls MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+                (match, per_page, offset),
+            ).fetchall()
+
+        for timestamp, call_text, summary, priority, department, confidence, snippet, rank in rows:
+            result["results"].append({
+                "timestamp": timestamp,
+                "call_text": call_text,
+                "summary": summary,
+                "priority": priority,
+                "department": department,
+                "confidence": confidence,
+                "snippet": snippet,
+                # bm25 is lower for better matches; flip it so higher is better
+                "score": -rank,
+            })
+        return result
+
+
+_index: Optional[CallSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> CallSearchIndex:
+    """The shared search index, brought up to date with the call log on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = CallSearchIndex(ROOT_DIR / os.getenv("SEARCH_INDEX_FILE", "data/call_search.db"))
+            already_indexed = index.indexed
+            get_call_log_store().subscribe(index.on_call_saved, start=already_indexed)
+            logger.info(f"Search index held {already_indexed} calls; queued the calls saved since")
+            _index = index
+        return _index
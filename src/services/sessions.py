@@ -0,0 +1,91 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+from src.services.llm.result import Classification
+
+
+class CallSession:
+    """What has been said on one call and how it is classified so far."""
+
+    def __init__(self, call_sid: str):
+        self.call_sid = call_sid
+        self.utterances = []
+        self.classification = None
+        self.updated_at = time.time()
+        self.media_stream_started = False
+        # Set when the caller's speech arrives, before it is classified
+        self.has_spoken = False
+        # Turns of the same call are classified one at a time, in order
+        self.lock = threading.Lock()
+
+    def record(self, utterance: str, classification: Optional[Classification]):
+        self.utterances.append(utterance)
+        if classification is not None:
+            self.classification = classification
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.utterances)
+
+
+class CallSessionStore:
+    """Bounded in-memory sessions keyed by Twilio CallSid.
+
+    Sessions expire `ttl` seconds after the last turn of the call, and the
+    least recently active are dropped beyond `max_sessions`.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, call_sid: str) -> Optional[CallSession]:
+        with self._lock:
+            self._expire()
+            return self._sessions.get(call_sid)
+
+    def get_or_create(self, call_sid: str) -> CallSession:
+        """The session for a new turn of the call, marked as active now."""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(call_sid)
+            if session is None:
+                session = self._sessions[call_sid] = CallSession(call_sid)
+            session.updated_at = time.time()
+            self._sessions.move_to_end(call_sid)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def _expire(self):
+        # Sessions are kept in order of activity, so stop at the first live one
+        cutoff = time.time() - self.ttl
+        while self._sessions:
+            call_sid, session = next(iter(self._sessions.items()))
+            if session.updated_at >= cutoff:
+                break
+            del self._sessions[call_sid]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+_sessions: Optional[CallSessionStore] = None
+_sessions_lock = threading.Lock()
+
+
+def get_session_store() -> CallSessionStore:
+    """Return the shared session store, configured from the environment on first use."""
+    global _sessions
+    with _sessions_lock:
+        if _sessions is None:
+            _sessions = CallSessionStore(
+                max_sessions=int(os.getenv("CALL_SESSIONS_MAX", "1000")),
+                ttl=float(os.getenv("CALL_SESSION_TTL", "3600")),
+            )
+        return _sessions
@@ -0,0 +1,136 @@
+import os
+import json
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+from src.utils.storage import ROOT_DIR
+
+logger = logging.getLogger(__name__)
+
+# Twilio Media Streams send 8 kHz mono G.711 μ-law, one byte per sample
+SAMPLE_RATE = 8000
+
+
+@lru_cache(maxsize=None)
+def ulaw_to_pcm16_table():
+    """PCM16 value of each μ-law byte; NumPy is only imported once audio is decoded."""
+    import numpy as np
+
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa.astype(np.int32) << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def mulaw_to_pcm16(audio):
+    """Decode μ-law bytes (or a memoryview of them) to 16-bit PCM samples."""
+    import numpy as np
+
+    return ulaw_to_pcm16_table()[np.frombuffer(audio, dtype=np.uint8)]
+
+
+class StreamingTranscriber:
+    """Turns a call's audio into text while it is still arriving.
+
+    `feed` takes the next μ-law audio and returns the transcript so far when
+    it changed, or None. `finish` returns the final transcript.
+    """
+
+    name = None
+
+    def feed(self, audio: memoryview) -> Optional[str]:
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        raise NotImplementedError
+
+
+class StubTranscriber(StreamingTranscriber):
+    """Reveals a scripted transcript at speaking pace, for tests and demos.
+
+    The script comes from `STUB_TRANSCRIPT` unless one is given.
+    """
+
+    name = "stub"
+
+    def __init__(self, script: str = None, words_per_second: float = 2.5):
+        self.words = (script if script is not None else os.getenv("STUB_TRANSCRIPT", "")).split()
+        self.words_per_second = words_per_second
+        self.samples = 0
+        self.revealed = 0
+
+    def feed(self, audio: memoryview) -> Optional[str]:
+        self.samples += len(audio)
+        revealed = min(len(self.words), int(self.samples / SAMPLE_RATE * self.words_per_second))
+        if revealed == self.revealed:
+            return None
+        self.revealed = revealed
+        return " ".join(self.words[:revealed])
+
+    def finish(self) -> str:
+        return " ".join(self.words[: self.revealed])
+
+
+_vosk_model = None
+_vosk_lock = threading.Lock()
+
+
+class VoskTranscriber(StreamingTranscriber):
+    """Offline speech recognition with Vosk (needs the `vosk` package).
+
+    The model directory is `VOSK_MODEL_PATH`; it is loaded once and shared by
+    all calls.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path: str = None):
+        global _vosk_model
+        from vosk import KaldiRecognizer, Model
+
+        with _vosk_lock:
+            if _vosk_model is None:
+                path = ROOT_DIR / (model_path or os.getenv("VOSK_MODEL_PATH", "data/vosk-model"))
+                _vosk_model = Model(str(path))
+        self.recognizer = KaldiRecognizer(_vosk_model, SAMPLE_RATE)
+        ulaw_to_pcm16_table()
+        self.utterances = []
+        self.partial = ""
+
+    def _transcript(self) -> str:
+        return " ".join(self.utterances + ([self.partial] if self.partial else []))
+
+    def feed(self, audio: memoryview) -> Optional[str]:
+        previous = self._transcript()
+        if self.recognizer.AcceptWaveform(mulaw_to_pcm16(audio).tobytes()):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.utterances.append(text)
+            self.partial = ""
+        else:
+            self.partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        transcript = self._transcript()
+        return transcript if transcript != previous else None
+
+    def finish(self) -> str:
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        if text:
+            self.utterances.append(text)
+        self.partial = ""
+        return self._transcript()
+
+
+TRANSCRIBERS = {
+    StubTranscriber.name: StubTranscriber,
+    VoskTranscriber.name: VoskTranscriber,
+}
+
+
+def create_transcriber() -> StreamingTranscriber:
+    """A new transcriber for one call, of the kind set by `TRANSCRIBER`."""
+    name = os.getenv("TRANSCRIBER", "vosk")
+    if name not in TRANSCRIBERS:
+        raise ValueError(f"Unknown transcriber: {name}")
+    return TRANSCRIBERS[name]()
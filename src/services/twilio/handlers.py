@@ -1,46 +1,108 @@
 import os
+import uuid
 import logging
-from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse, Gather
+import threading
+from twilio.twiml.voice_response import VoiceResponse, Gather, Start
 from src.api.arize import process_call
+from src.services.jobs import async_processing_enabled, classify_utterance, get_job_queue
+from src.services.sessions import get_session_store
+from src.services.twilio.media_stream import media_stream_url
 
 logger = logging.getLogger(__name__)
 
 class TwilioHandler:
+    """Application-scoped Twilio handler.
+
+    One instance is created by `create_app` and shared by every request. The
+    REST client is only built the first time it is used, on a pooled HTTP
+    session, so rendering TwiML never touches it.
+    """
+
     def __init__(self):
-        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
+        self.account_sid = os.getenv('TWILIO_ACCOUNT_SID')
+        self.auth_token = os.getenv('TWILIO_AUTH_TOKEN')
         
-        if not account_sid or not auth_token:
+        if not self.account_sid or not self.auth_token:
             logger.error("Twilio credentials not found in environment variables")
             raise ValueError("TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN must be set")
-            
-        self.client = Client(account_sid, auth_token)
 
-    def handle_incoming_call(self):
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from twilio.rest import Client
+                    from twilio.http.http_client import TwilioHttpClient
+
+                    self._client = Client(
+                        self.account_sid,
+                        self.auth_token,
+                        http_client=TwilioHttpClient(pool_connections=True),
+                    )
+        return self._client
+
+    def handle_incoming_call(self, call_sid: str = None):
         """Handle incoming phone calls"""
+        session = get_session_store().get(call_sid) if call_sid else None
         response = VoiceResponse()
+
+        # Fork the caller's audio to the media stream endpoint, once per call,
+        # so triage can start while they are still talking
+        stream_url = media_stream_url()
+        if stream_url and call_sid:
+            session = get_session_store().get_or_create(call_sid)
+            if not session.media_stream_started:
+                start = Start()
+                start.stream(url=stream_url, track="inbound_track")
+                response.append(start)
+                session.media_stream_started = True
+
         gather = Gather(
             input="speech",
             action="/process_speech",
             timeout=3,
             speech_timeout="auto"
         )
-        gather.say("Nine-one-one what is your emergency.")
+        if session is not None and session.has_spoken:
+            gather.say("Is there anything else you can tell me?")
+        else:
+            gather.say("Nine-one-one what is your emergency.")
         response.append(gather)
         response.redirect("/answer")
         return str(response)
 
-    def handle_speech_processing(self, speech_result: str, socketio):
-        """Process the speech input from the caller"""
-        if speech_result:
-            result = process_call(speech_result)
+    def handle_speech_processing(self, speech_result: str, socketio, call_sid: str = None):
+        """Process the speech input from the caller
+
+        With a CallSid, each utterance is classified in the context of the
+        earlier ones and updates the call's dashboard card.
+        """
+        session = get_session_store().get_or_create(call_sid) if call_sid and speech_result else None
+        if session is not None:
+            # The redirect to /answer may come back before the utterance is classified
+            session.has_spoken = True
+        if speech_result and async_processing_enabled():
+            # Classify in the background and answer the caller right away
+            get_job_queue(process_call, socketio).submit(speech_result, session)
+
+            response = VoiceResponse()
+            response.say(f"I heard: {speech_result}")
+            response.say("Help is being arranged. Please stay on the line.")
+            response.redirect("/answer")
+        elif speech_result:
+            call_id = call_sid or uuid.uuid4().hex
+            result = classify_utterance(process_call, socketio, call_id, speech_result, session)
             logger.info(f"Processing result: {result}")
 
             response = VoiceResponse()
             response.say(f"I heard: {speech_result}")
-            socketio.emit("send_message", result)
-            response.say(f"Processing result: {result}")
+            response.say(f"Processing result: {result.to_dict()}")
+            if session is not None:
+                # Keep listening so later utterances refine the classification
+                response.redirect("/answer")
         else:
             logger.warning("No speech detected")
             response = VoiceResponse()
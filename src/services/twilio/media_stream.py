@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import socket
+import base64
+import logging
+import threading
+from typing import Callable, List, Optional
+from flask import Response
+from src.services.feed import publish_update
+from src.services.transcription import SAMPLE_RATE, StreamingTranscriber
+from src.utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+
+class AudioRingBuffer:
+    """Fixed-size ring buffer for a call's audio.
+
+    Each frame is copied in once. `read` hands back memoryviews into the
+    buffer instead of copies, and the space they cover is only reused after
+    the reader passes their size to `commit`. If the reader falls `capacity`
+    bytes behind, new audio is dropped until it catches up.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        # Total bytes ever written and committed, so positions never wrap
+        self.written = 0
+        self.read_position = 0
+        self.dropped = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def write(self, data: bytes):
+        with self._condition:
+            free = self.capacity - (self.written - self.read_position)
+            if len(data) > free:
+                self.dropped += len(data) - free
+                data = memoryview(data)[:free]
+            size = len(data)
+            if not size:
+                return
+            start = self.written % self.capacity
+            first = min(size, self.capacity - start)
+            self._view[start:start + first] = data[:first]
+            self._view[:size - first] = data[first:]
+            self.written += size
+            self._condition.notify()
+
+    def read(self, timeout: float = None) -> List[memoryview]:
+        """Wait for audio and return it as one or two views; empty once closed and drained.
+
+        The views stay valid until they are committed.
+        """
+        with self._condition:
+            while self.written == self.read_position and not self.closed:
+                if not self._condition.wait(timeout):
+                    return []
+            size = self.written - self.read_position
+            if not size:
+                return []
+            start = self.read_position % self.capacity
+        first = min(size, self.capacity - start)
+        views = [self._view[start:start + first]]
+        if size > first:
+            views.append(self._view[:size - first])
+        return views
+
+    def commit(self, size: int):
+        """Release the oldest `size` bytes returned by `read` for new audio."""
+        with self._condition:
+            self.read_position += size
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class MediaStream:
+    """One Twilio Media Stream: transcribe the caller while they talk and
+    classify the transcript as it grows.
+
+    As in the listener/recognizer split of the old threaded prototype, the
+    websocket thread only decodes audio frames into a ring buffer, and a
+    recognizer thread feeds the buffered audio to the transcriber. Once the
+    transcript has grown by `min_new_words`, it is classified on a third
+    thread, at most once every `min_interval` seconds; meanwhile only the
+    newest transcript waits, so a slow classifier never falls further behind.
+    Results are pushed to the call's dashboard card as partial updates. The
+    final classification comes from the `<Gather>` speech result, so what is
+    still waiting when the stream stops is dropped.
+    """
+
+    def __init__(
+        self,
+        socketio,
+        transcriber: StreamingTranscriber,
+        classify: Callable,
+        buffer_seconds: float = 10,
+        min_new_words: int = 3,
+        min_interval: float = 3,
+    ):
+        self.socketio = socketio
+        self.transcriber = transcriber
+        self.classify = classify
+        self.min_new_words = min_new_words
+        self.min_interval = min_interval
+        self.buffer = AudioRingBuffer(int(buffer_seconds * SAMPLE_RATE))
+        self.call_sid = None
+        self.stream_sid = None
+        self._classified_words = 0
+        self._pending: Optional[str] = None
+        self._done = False
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def handle(self, message: dict) -> bool:
+        """Process one websocket message; returns False when the stream has ended."""
+        event = message.get("event")
+        if event == "media":
+            media = message["media"]
+            if media.get("track", "inbound") == "inbound":
+                self.buffer.write(base64.b64decode(media["payload"]))
+        elif event == "start":
+            start = message["start"]
+            self.call_sid = start.get("callSid")
+            self.stream_sid = start.get("streamSid")
+            logger.info(f"Media stream {self.stream_sid} started for call {self.call_sid}")
+            for target in (self._recognize, self._classify_partials):
+                thread = threading.Thread(target=target, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        elif event == "stop":
+            return False
+        return True
+
+    def _recognize(self):
+        try:
+            while True:
+                views = self.buffer.read()
+                if not views:
+                    break
+                try:
+                    for view in views:
+                        transcript = self.transcriber.feed(view)
+                        if transcript is not None:
+                            self._offer(transcript)
+                finally:
+                    self.buffer.commit(sum(len(view) for view in views))
+            self._offer(self.transcriber.finish())
+        except Exception as e:
+            logger.error(f"Transcription failed for call {self.call_sid}: {e}")
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify()
+
+    def _offer(self, transcript: str):
+        words = len(transcript.split())
+        with self._condition:
+            if words >= self._classified_words + self.min_new_words:
+                self._classified_words = words
+                self._pending = transcript
+                self._condition.notify()
+
+    def _classify_partials(self):
+        next_at = 0.0
+        while True:
+            with self._condition:
+                while not self._done and (self._pending is None or time.monotonic() < next_at):
+                    self._condition.wait(None if self._pending is None else next_at - time.monotonic())
+                if self._done:
+                    return
+                transcript, self._pending = self._pending, None
+            next_at = time.monotonic() + self.min_interval
+            try:
+                with stage("partial_classification"):
+                    result = self.classify(transcript)
+                publish_update(
+                    self.socketio,
+                    "classification_update",
+                    {**result.to_dict(), "call_id": self.call_sid, "transcript": transcript, "partial": True},
+                )
+            except Exception as e:
+                logger.error(f"Partial classification failed for call {self.call_sid}: {e}")
+
+    def close(self):
+        """Stop transcribing and wait for a classification in progress."""
+        self.buffer.close()
+        for thread in self._threads:
+            thread.join()
+        if self.buffer.dropped:
+            logger.warning(f"Dropped {self.buffer.dropped} bytes of audio for call {self.call_sid}")
+
+
+def media_stream_url() -> Optional[str]:
+    """Public wss:// URL of the media stream endpoint; streaming is off when unset."""
+    return os.getenv("MEDIA_STREAM_URL")
+
+
+def serve_media_stream(environ: dict, stream: MediaStream) -> Response:
+    """Run a Twilio Media Streams websocket to completion.
+
+    The websocket is taken over from the WSGI server, so the returned
+    response only tells the server that the connection has been handled.
+    """
+    from simple_websocket import ConnectionClosed, Server
+
+    ws = Server.accept(environ)
+    try:
+        while True:
+            data = ws.receive()
+            if data is None or not stream.handle(json.loads(data)):
+                break
+    except ConnectionClosed:
+        pass
+    finally:
+        stream.close()
+    try:
+        ws.close()
+        # Wait for the client's close frame, then end the TCP connection so
+        # the WSGI server does not read on from it as the next request
+        ws.thread.join(timeout=5)
+    except ConnectionClosed:
+        pass
+    try:
+        ws.sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+    class WebSocketResponse(Response):
+        def __call__(self, *args, **kwargs):
+            if ws.mode == "gunicorn":
+                raise StopIteration()
+            if ws.mode == "werkzeug":
+                raise ConnectionError()
+            return []
+
+    return WebSocketResponse()
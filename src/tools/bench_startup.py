@@ -0,0 +1,77 @@
+"""Cold-start benchmark and import-time profile of the Flask app.
+
+Usage:
+    python -m src.tools.bench_startup [--runs 5] [--top 15]
+
+Each run starts a fresh interpreter, creates the app and times the first
+response from the `/` health route. The profile lists the slowest imports
+reported by `python -X importtime`. Credentials are dummy values.
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from src.utils.storage import ROOT_DIR
+
+COLD_START = """
+import time
+started = time.perf_counter()
+from src.app import app
+app.test_client().get("/")
+print(time.perf_counter() - started)
+"""
+
+
+def bench_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("TWILIO_ACCOUNT_SID", "AC" + "0" * 32)
+    env.setdefault("TWILIO_AUTH_TOKEN", "0" * 32)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    env.setdefault("TRACING_ENABLED", "false")
+    return env
+
+
+def cold_start(runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START],
+            cwd=ROOT_DIR, env=bench_env(), capture_output=True, text=True, check=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def import_profile(top: int) -> list:
+    """(cumulative microseconds, module) of the slowest imports of src.app."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app"],
+        cwd=ROOT_DIR, env=bench_env(), capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time of the Flask app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    timings = cold_start(args.runs)
+    print(f"cold start to first response: median {statistics.median(timings):.3f}s "
+          f"(min {min(timings):.3f}s, max {max(timings):.3f}s, {args.runs} runs)")
+    print()
+    print("slowest imports (cumulative):")
+    for cumulative, module in import_profile(args.top):
+        print(f"{cumulative / 1000:9.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
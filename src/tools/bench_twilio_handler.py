@@ -0,0 +1,49 @@
+"""Micro-benchmark of per-request Twilio handler overhead.
+
+Usage:
+    python -m src.tools.bench_twilio_handler [--requests 2000]
+
+Compares building a handler and REST client on every request, as the routes
+used to, with the shared application-scoped handler. Credentials are dummy
+values; no HTTP requests are made.
+"""
+import os
+import time
+import argparse
+from twilio.rest import Client
+from src.services.twilio.handlers import TwilioHandler
+
+
+def per_request(requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        handler = TwilioHandler()
+        # The old constructor built a REST client for every request
+        Client(handler.account_sid, handler.auth_token)
+        handler.handle_incoming_call()
+    return time.perf_counter() - started
+
+
+def shared(requests: int) -> float:
+    handler = TwilioHandler()
+    started = time.perf_counter()
+    for _ in range(requests):
+        handler.handle_incoming_call()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request Twilio handler overhead")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("TWILIO_ACCOUNT_SID", "AC" + "0" * 32)
+    os.environ.setdefault("TWILIO_AUTH_TOKEN", "0" * 32)
+
+    for name, bench in (("per-request", per_request), ("shared", shared)):
+        elapsed = bench(args.requests)
+        print(f"{name:<12} {1e6 * elapsed / args.requests:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
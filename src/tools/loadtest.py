@@ -0,0 +1,283 @@
+"""Offline load test of the Twilio webhooks.
+
+Usage:
+    python -m src.tools.loadtest [--rate 20] [--duration 30] [--concurrency 64]
+        [--llm-latency-ms 800] [--llm-jitter-ms 300] [--turns 1] [--max-p95-ms N]
+
+Replays synthetic calls against the Flask app in-process: each call posts
+`/answer` and then `/process_speech` with a `SpeechResult` drawn from the
+transcripts in `data/call_logs.json`. Calls arrive as a Poisson process at
+`--rate` per second. `ChatOpenAI` is replaced by a stub that answers with the
+logged classification after a configurable latency and jitter, and the Twilio
+REST client by a fake, so no network access is needed. Calls are written to a
+temporary call log, not the real one.
+
+Latencies are measured from each request's scheduled send time, so time
+spent waiting for a free client thread counts against the server. Socket
+delivery lag is the time from posting `/process_speech` until a dashboard
+connected over SocketIO receives the call's `send_message` event.
+
+With `--max-p95-ms`, the exit status is 1 when the `/process_speech` p95
+exceeds it, so the run can gate CI.
+"""
+import os
+import sys
+import json
+import time
+import re
+import random
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+FALLBACK_TRANSCRIPTS = [
+    {"call_text": "I lost my cat.", "priority": "GREEN", "department": "POLICEDEPT", "summary": "lost cat"},
+    {"call_text": "My neighbor's house is on fire.", "priority": "RED", "department": "FIREDEPT", "summary": "house fire"},
+    {"call_text": "My father collapsed and is not breathing.", "priority": "RED", "department": "EMS", "summary": "not breathing"},
+    {"call_text": "Someone broke into my car last night.", "priority": "ORANGE", "department": "POLICEDEPT", "summary": "car break-in"},
+]
+
+
+# The new utterance in a follow-up prompt, as written by build_messages
+FOLLOW_UP_UTTERANCE = re.compile(r"^The caller now says: (.*)$", re.MULTILINE)
+
+
+class StubMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class StubChatModel:
+    """Stand-in for `ChatOpenAI` that sleeps for the configured latency and
+    answers with the classification logged for the transcript."""
+
+    def __init__(self, answers: dict, latency: float, jitter: float, seed: int = 0):
+        self.answers = answers
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _completion(self, messages) -> str:
+        transcript = messages[-1].content
+        if transcript not in self.answers:
+            # A later turn: the utterance is wrapped with the call's classification so far
+            match = FOLLOW_UP_UTTERANCE.search(transcript)
+            transcript = match.group(1) if match else transcript
+        call = self.answers.get(transcript, FALLBACK_TRANSCRIPTS[0])
+        answer = {
+            "priority": call.get("priority", "GREEN"),
+            "summary": call.get("summary", "no summary"),
+            "department": call.get("department", "POLICEDEPT"),
+            "confidence": str(call.get("confidence", "80")),
+        }
+        return f"```json\n{json.dumps(answer)}\n```"
+
+    def invoke(self, messages, **kwargs):
+        time.sleep(self._delay())
+        return StubMessage(self._completion(messages))
+
+    def stream(self, messages):
+        # Spread the latency over the chunks, as a streamed completion would
+        content = self._completion(messages)
+        chunks = [content[i:i + 8] for i in range(0, len(content), 8)]
+        delay = self._delay() / len(chunks)
+        for chunk in chunks:
+            time.sleep(delay)
+            yield StubMessage(chunk)
+
+
+class FakeTwilioClient:
+    """Records REST calls instead of sending them to Twilio."""
+
+    class _Resource:
+        def __init__(self, requests: list, name: str):
+            self._requests = requests
+            self._name = name
+
+        def create(self, **kwargs):
+            self._requests.append((self._name, kwargs))
+            return kwargs
+
+    def __init__(self):
+        self.requests = []
+        self.calls = self._Resource(self.requests, "calls")
+        self.messages = self._Resource(self.requests, "messages")
+
+
+class TimedQueue(list):
+    """Event queue of the SocketIO test client that notes when each event arrived."""
+
+    def __init__(self):
+        super().__init__()
+        self.received = {}
+
+    def append(self, event):
+        if event["name"] == "send_message":
+            call_id = event["args"][0].get("call_id")
+            if call_id is not None:
+                self.received[call_id] = time.perf_counter()
+        super().append(event)
+
+
+def load_transcripts() -> list:
+    from src.utils.storage import ROOT_DIR, LEGACY_LOG_FILE
+
+    path = ROOT_DIR / LEGACY_LOG_FILE
+    if path.exists():
+        with open(path) as f:
+            calls = [call for call in json.load(f) if call.get("call_text")]
+        if calls:
+            return calls
+    return FALLBACK_TRANSCRIPTS
+
+
+def configure_env(args, workdir: str):
+    """Point the app at throwaway files and dummy credentials before it is imported."""
+    os.environ["CALL_LOG_FILE"] = os.path.join(workdir, "call_logs.jsonl")
+    os.environ["SEARCH_INDEX_FILE"] = os.path.join(workdir, "call_search.db")
+    os.environ["TWILIO_ACCOUNT_SID"] = "AC" + "0" * 32
+    os.environ["TWILIO_AUTH_TOKEN"] = "0" * 32
+    os.environ["OPENAI_API_KEY"] = "sk-loadtest"
+    os.environ["TRACING_ENABLED"] = "false"
+    os.environ["WARM_UP"] = "false"
+    os.environ.pop("SOCKETIO_MESSAGE_QUEUE", None)
+    os.environ["CLASSIFIER_BACKENDS"] = "openai,degraded"
+    os.environ["ASYNC_SPEECH_PROCESSING"] = "true" if args.async_processing else "false"
+    os.environ["RULES_FAST_PATH"] = "true" if args.rules else "false"
+    os.environ["CLASSIFICATION_CACHE"] = "true" if args.cache else "false"
+    os.environ.pop("CLASSIFICATION_CACHE_FILE", None)
+
+
+def percentiles(values: list) -> str:
+    if not values:
+        return "no samples"
+    p50, p90, p95, p99 = np.percentile(np.array(values) * 1000, [50, 90, 95, 99])
+    return f"p50 {p50:7.1f}  p90 {p90:7.1f}  p95 {p95:7.1f}  p99 {p99:7.1f}  max {1000 * max(values):7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of the Twilio webhooks")
+    parser.add_argument("--rate", type=float, default=20, help="calls arriving per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of arrivals")
+    parser.add_argument("--concurrency", type=int, default=64, help="client threads")
+    parser.add_argument("--turns", type=int, default=1, help="utterances per call")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=300)
+    parser.add_argument("--async-processing", action="store_true", help="classify in the background job queue")
+    parser.add_argument("--rules", action="store_true", help="enable the keyword rules fast path")
+    parser.add_argument("--cache", action="store_true", help="enable the classification cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p95-ms", type=float, help="fail if the /process_speech p95 is higher")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    configure_env(args, workdir)
+
+    # The app is imported after the environment is set, since modules read it
+    # at import
+    from src.app import app
+    from src.api.routes import socketio
+    from src.services.llm.classifier import LLMHandler
+
+    transcripts = load_transcripts()
+    LLMHandler._llm = StubChatModel(
+        {call["call_text"]: call for call in transcripts},
+        latency=args.llm_latency_ms / 1000,
+        jitter=args.llm_jitter_ms / 1000,
+        seed=args.seed,
+    )
+    app.extensions["twilio_handler"]._client = FakeTwilioClient()
+
+    dashboard = socketio.test_client(app)
+    dashboard.queue = TimedQueue()
+
+    rng = random.Random(args.seed)
+    latencies = {"/answer": [], "/process_speech": []}
+    speech_sent = {}
+    errors = []
+    lock = threading.Lock()
+
+    def post(path: str, scheduled: float, data: dict):
+        response = app.test_client().post(path, data=data)
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            if response.status_code != 200:
+                errors.append((path, response.status_code))
+            else:
+                latencies[path].append(elapsed)
+
+    def run_call(n: int, scheduled: float, texts: list):
+        call_sid = f"CA{n:032d}"
+        for turn, text in enumerate(texts):
+            started = scheduled if turn == 0 else time.perf_counter()
+            post("/answer", started, {"CallSid": call_sid})
+            started = time.perf_counter()
+            with lock:
+                speech_sent[call_sid] = started
+            post("/process_speech", started, {"CallSid": call_sid, "SpeechResult": text})
+
+    arrivals = []
+    clock = 0.0
+    while True:
+        clock += rng.expovariate(args.rate)
+        if clock >= args.duration:
+            break
+        arrivals.append(clock)
+    print(
+        f"{len(arrivals)} calls over {args.duration:.0f}s at {args.rate:g}/s, "
+        f"stub LLM {args.llm_latency_ms:g}±{args.llm_jitter_ms:g} ms, "
+        f"{'async' if args.async_processing else 'sync'} processing"
+    )
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for n, offset in enumerate(arrivals):
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            texts = [rng.choice(transcripts)["call_text"] for _ in range(args.turns)]
+            pool.submit(run_call, n, scheduled, texts)
+
+    # With async processing the classifications land after the responses;
+    # wait while they keep arriving
+    stall_timeout = 2 * (args.llm_latency_ms + args.llm_jitter_ms) / 1000 + 5
+    last_progress, delivered = time.perf_counter(), 0
+    while delivered < len(speech_sent) and time.perf_counter() - last_progress < stall_timeout:
+        time.sleep(0.05)
+        if len(dashboard.queue.received) > delivered:
+            last_progress, delivered = time.perf_counter(), len(dashboard.queue.received)
+    elapsed = time.perf_counter() - started
+
+    lags = [
+        dashboard.queue.received[call_sid] - sent
+        for call_sid, sent in speech_sent.items()
+        if call_sid in dashboard.queue.received
+    ]
+    completed = len(latencies["/process_speech"])
+    print(f"throughput      {completed / elapsed:7.1f} utterances/s ({completed} in {elapsed:.1f}s)")
+    for path, values in latencies.items():
+        print(f"{path:<15} {percentiles(values)}")
+    print(f"{'socket lag':<15} {percentiles(lags)}")
+    print(f"errors          {len(errors)}   undelivered {len(speech_sent) - len(lags)}   llm calls {LLMHandler._llm.calls}")
+
+    if args.max_p95_ms is not None and latencies["/process_speech"]:
+        p95 = 1000 * float(np.percentile(latencies["/process_speech"], 95))
+        if p95 > args.max_p95_ms:
+            print(f"FAIL: /process_speech p95 {p95:.1f} ms exceeds {args.max_p95_ms:g} ms")
+            sys.exit(1)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Report the input token count of each prompt variant.
+
+Usage:
+    python -m src.tools.prompt_tokens [--model gpt-4] [--mode tools] [--call-text "..."]
+
+Counts follow OpenAI's chat format: the tokens of each message plus a fixed
+overhead per message and per reply. In tools mode the classify_call function
+definition is sent with every request, so its tokens are added too.
+"""
+import argparse
+import tiktoken
+from src.services.llm.classifier import CLASSIFY_TOOL, OUTPUT_MODES, SYSTEM_MESSAGES, build_messages
+
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Overheads of OpenAI's rendering of function definitions, per the OpenAI cookbook
+TOKENS_PER_FUNCTION = 7
+TOKENS_PER_FUNCTION_END = 12
+TOKENS_PER_PROPERTIES = 3
+TOKENS_PER_PROPERTY = 3
+TOKENS_PER_ENUM = -3
+TOKENS_PER_ENUM_ITEM = 3
+
+
+def count_message_tokens(messages: list, model: str = "gpt-4") -> int:
+    encoding = tiktoken.encoding_for_model(model)
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + len(encoding.encode(message.content))
+    return total
+
+
+def count_tool_tokens(tools: list, model: str = "gpt-4") -> int:
+    """Approximate tokens of function definitions sent with a request."""
+    encoding = tiktoken.encoding_for_model(model)
+    total = 0
+    for tool in tools:
+        function = tool["function"]
+        total += TOKENS_PER_FUNCTION
+        total += len(encoding.encode(f"{function['name']}:{function.get('description', '').rstrip('.')}"))
+        properties = function.get("parameters", {}).get("properties", {})
+        if properties:
+            total += TOKENS_PER_PROPERTIES
+            for name, schema in properties.items():
+                total += TOKENS_PER_PROPERTY
+                if "enum" in schema:
+                    total += TOKENS_PER_ENUM
+                    for item in schema["enum"]:
+                        total += TOKENS_PER_ENUM_ITEM + len(encoding.encode(item))
+                description = schema.get("description", "").rstrip(".")
+                total += len(encoding.encode(f"{name}:{schema['type']}:{description}"))
+    if tools:
+        total += TOKENS_PER_FUNCTION_END
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Input token count per prompt variant")
+    parser.add_argument("--model", default="gpt-4", help="model whose tokenizer to use")
+    parser.add_argument("--mode", default="tools", choices=OUTPUT_MODES, help="LLM output mode")
+    parser.add_argument("--call-text", default="There's a man with a knife outside my house.")
+    args = parser.parse_args()
+
+    tool_tokens = count_tool_tokens([CLASSIFY_TOOL] if args.mode == "tools" else [], args.model)
+    baseline = None
+    print(f"{'variant':<10} {'system':>8} {'tools':>6} {'per call':>9} {'saving':>8}")
+    for variant, system_message in SYSTEM_MESSAGES[args.mode].items():
+        system_tokens = count_message_tokens([system_message], args.model)
+        total = count_message_tokens(build_messages(args.call_text, variant, mode=args.mode), args.model) + tool_tokens
+        if baseline is None:
+            baseline = total
+        saving = 100 * (baseline - total) / baseline
+        print(f"{variant:<10} {system_tokens:>8} {tool_tokens:>6} {total:>9} {saving:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
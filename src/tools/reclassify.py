@@ -0,0 +1,148 @@
+"""Re-run classification over the historical call log.
+
+Usage:
+    python -m src.tools.reclassify [--input data/call_logs.jsonl]
+        [--output data/reclassified.jsonl] [--concurrency 8]
+
+Results are appended to the output file as they complete, one line per call
+keyed by its position in the log. Re-running the command resumes from that
+file and skips calls that were already classified successfully.
+"""
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+from src.utils.storage import ROOT_DIR, get_call_log_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether the error is a provider rate limit worth backing off for."""
+    status = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def classify_with_backoff(classify, call_text: str, max_retries: int, base_delay: float):
+    """Classify a transcript, retrying rate limits with jittered exponential backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return classify(call_text)
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == max_retries:
+                raise
+            delay = base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+            logger.warning(f"Rate limited, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def load_checkpoint(output_path: Path) -> set:
+    """Indices of calls already classified successfully in a previous run."""
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in entry:
+                done.add(entry["index"])
+    return done
+
+
+def reclassify(
+    input_file: Optional[str],
+    output_file: str,
+    classify,
+    concurrency: int = 8,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    limit: int = None,
+) -> dict:
+    """Classify every pending call in the log and append the results."""
+    output_path = ROOT_DIR / output_file
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    done = load_checkpoint(output_path)
+    if done:
+        logger.info(f"Resuming, {len(done)} calls already classified")
+
+    write_lock = threading.Lock()
+    counts = {"classified": 0, "failed": 0, "skipped": len(done)}
+
+    def run(index: int, call: dict):
+        entry = {"index": index, "timestamp": call.get("timestamp"), "call_text": call["call_text"]}
+        try:
+            entry.update(classify_with_backoff(classify, call["call_text"], max_retries, base_delay).to_dict())
+        except Exception as e:
+            logger.error(f"Failed to classify call {index}: {e}")
+            entry["error"] = str(e)
+        entry["original"] = {
+            key: call.get(key) for key in ("priority", "department", "summary", "confidence")
+        }
+        with write_lock:
+            counts["failed" if "error" in entry else "classified"] += 1
+            with open(output_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    # Keep a bounded window of in-flight calls so the log is streamed, not loaded
+    pending = set()
+    submitted = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, call in enumerate(get_call_log_store(input_file, read_only=True).iter_calls()):
+            if index in done or not call.get("call_text"):
+                continue
+            if limit is not None and submitted >= limit:
+                break
+            if len(pending) >= concurrency * 2:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            pending.add(executor.submit(run, index, call))
+            submitted += 1
+        wait(pending)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-classify the historical call log")
+    parser.add_argument("--input", default=None, help="call log to read (default: CALL_LOG_FILE)")
+    parser.add_argument("--output", default="data/reclassified.jsonl", help="results file")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel LLM requests")
+    parser.add_argument("--max-retries", type=int, default=5, help="retries on rate limits")
+    parser.add_argument("--limit", type=int, default=None, help="classify at most N calls")
+    args = parser.parse_args()
+
+    load_dotenv(ROOT_DIR / "config" / ".env")
+
+    # Imported here so --help works without the LLM dependencies configured
+    from src.services.llm.classifier import LLMHandler, classify_with_llm
+
+    # The bare model: a burst of 429s is backed off here, and would otherwise
+    # be retried again inside ResilientLLM and trip its circuit breaker,
+    # failing every later call fast
+    classify = partial(classify_with_llm, llm=LLMHandler.get_llm())
+
+    started = time.perf_counter()
+    counts = reclassify(
+        args.input,
+        args.output,
+        classify,
+        concurrency=args.concurrency,
+        max_retries=args.max_retries,
+        limit=args.limit,
+    )
+    elapsed = time.perf_counter() - started
+    logger.info(f"Done in {elapsed:.1f}s: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Train the local classifier backend from the labeled call log.
+
+Usage:
+    python -m src.tools.train_local_model [--input data/call_logs.jsonl]
+        [--output data/local_classifier.json]
+"""
+import time
+import logging
+import argparse
+from src.utils.storage import ROOT_DIR, get_call_log_store
+from src.services.llm.local_model import TfidfCentroidModel, is_training_example
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local classifier backend")
+    parser.add_argument("--input", default=None, help="labeled call log (default: CALL_LOG_FILE)")
+    parser.add_argument("--output", default="data/local_classifier.json", help="model file")
+    args = parser.parse_args()
+
+    calls = get_call_log_store(args.input, read_only=True).load_calls()
+    model = TfidfCentroidModel.train(calls)
+    model.save(ROOT_DIR / args.output)
+
+    # Accuracy on the training data and mean inference time, as a sanity check
+    labeled = [call for call in calls if is_training_example(call)]
+    started = time.perf_counter()
+    predictions = [model.predict(call["call_text"]) for call in labeled]
+    elapsed = time.perf_counter() - started
+    correct = sum(
+        1 for call, prediction in zip(labeled, predictions)
+        if prediction and prediction["priority"] == call["priority"]
+    )
+    logger.info(
+        f"Saved model to {args.output}: priority accuracy {correct}/{len(labeled)}, "
+        f"{1000 * elapsed / max(len(labeled), 1):.3f} ms per call"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import time
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("ecc-triage")
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond rules to slow LLM calls
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts plus a window of recent samples for quantiles."""
+
+    def __init__(self, window: int = 1024):
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.bucket_counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        samples = sorted(self.recent)
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+class MetricsRegistry:
+    """Per-stage latency histograms, error counts and queue-depth gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._gauges: Dict[str, tuple] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._latency.get(stage)
+            if histogram is None:
+                histogram = self._latency[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def count_error(self, stage: str):
+        with self._lock:
+            self._errors[stage] = self._errors.get(stage, 0) + 1
+
+    def register_gauge(self, name: str, label: str, read: Callable[[], Dict[str, float]]):
+        """Register a gauge read at scrape time; `read` maps values of `label` to readings."""
+        self._gauges[name] = (label, read)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP triage_stage_seconds Latency of each stage of call processing",
+            "# TYPE triage_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._latency.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f'triage_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'triage_stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'triage_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            lines.append("# HELP triage_stage_seconds_quantile Recent latency quantiles of each stage")
+            lines.append("# TYPE triage_stage_seconds_quantile gauge")
+            for stage, histogram in sorted(self._latency.items()):
+                for q in QUANTILES:
+                    lines.append(
+                        f'triage_stage_seconds_quantile{{stage="{stage}",quantile="{q}"}} {histogram.quantile(q)}'
+                    )
+
+            lines.append("# HELP triage_stage_errors_total Errors raised in each stage")
+            lines.append("# TYPE triage_stage_errors_total counter")
+            for stage, count in sorted(self._errors.items()):
+                lines.append(f'triage_stage_errors_total{{stage="{stage}"}} {count}')
+
+        for name, (label_name, read) in sorted(self._gauges.items()):
+            lines.append(f"# TYPE triage_{name} gauge")
+            try:
+                readings = read()
+            except Exception as e:
+                logger.error(f"Error reading gauge {name}: {e}")
+                continue
+            for label, value in sorted(readings.items()):
+                lines.append(f'triage_{name}{{{label_name}="{label}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def stage(name: str):
+    """Trace a stage of call processing as a span and record its latency."""
+    with tracer.start_as_current_span(name):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            metrics.count_error(name)
+            raise
+        finally:
+            metrics.observe(name, time.perf_counter() - started)
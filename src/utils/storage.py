@@ -1,13 +1,607 @@
+import io
+import os
+import gzip
+import fcntl
 import json
+import mmap
+import shutil
+import itertools
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
-def save_call_to_json(
-    call_text: str, response_data: dict, filename: str = "data/call_logs.json"
-) -> None:
+# Get project root directory
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+DEFAULT_LOG_FILE = "data/call_logs.jsonl"
+LEGACY_LOG_FILE = "data/call_logs.json"
+
+
+def default_log_file() -> str:
+    """The call log file, from `CALL_LOG_FILE` at the time of asking.
+
+    Read when a store is created rather than at import, so a value from
+    config/.env applies.
+    """
+    return os.getenv("CALL_LOG_FILE", DEFAULT_LOG_FILE)
+
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def _epoch(timestamp) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _segment_stats(calls: Iterable[dict]) -> dict:
+    """Entry count and time range of a segment."""
+    count = 0
+    start = end = None
+    for call in calls:
+        count += 1
+        epoch = _epoch(call.get("timestamp"))
+        if epoch is not None:
+            start = epoch if start is None else min(start, epoch)
+            end = epoch if end is None else max(end, epoch)
+    return {"count": count, "start": start, "end": end}
+
+
+def _read_lines(path: Path, size: Optional[int] = None, offset: int = 0) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from _map_lines(f, path, size, offset)
+
+
+def _map_lines(f, path: Path, size: Optional[int] = None, offset: int = 0) -> Iterator[bytes]:
+    """Memory-map a segment and yield its lines, decompressing .gz and .zst segments.
+
+    With `size`, only the first `size` bytes are read, which gives a
+    consistent snapshot of a file that is still being appended to. `offset`
+    skips the start of an uncompressed segment.
+    """
+    size = os.fstat(f.fileno()).st_size if size is None else size
+    if size <= offset:
+        return
+    with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+        if path.suffix == ".gz":
+            source = gzip.GzipFile(fileobj=mapped)
+        elif path.suffix == ".zst":
+            import zstandard
+
+            source = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(mapped))
+        else:
+            source = mapped
+            mapped.seek(offset)
+        try:
+            yield from iter(source.readline, b"")
+        finally:
+            if source is not mapped:
+                source.close()
+
+
+def _parse_lines(lines: Iterable[bytes], name: str) -> Iterator[dict]:
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            # A torn last line from a crash should not hide the rest of the log
+            logger.error(f"Skipping malformed call log line {line_number} of {name}: {e}")
+
+
+def _segment_number(name: str) -> int:
+    return int(name.split(".")[0])
+
+
+def _empty_active() -> dict:
+    return {"count": 0, "start": None, "end": None, "bytes": 0, "inode": None}
+
+
+class CallLogStore:
+    """Append-only JSONL call log, rotated into segments.
+
+    Every call is written as a single line to the active segment, the file at
+    `filename`, so a save costs the same no matter how large the history is.
+
+    Once the active segment reaches `segment_bytes` or spans `segment_hours`,
+    it is moved into the `<name>.segments` directory next to it and
+    compressed in the background. `manifest.json` there lists the segments
+    in order with their time ranges, so queries for a time window only open
+    the segments that overlap it. Segments are read through `mmap`.
+
+    Several processes may share the log. Appends, rotation and manifest
+    writes hold an exclusive `flock` on `<name>.lock`, and readers a shared
+    one while they take a snapshot; the manifest and the active segment's
+    size are re-read under it, so each process sees the others' writes.
+    A `read_only` store never writes, recovers or compresses anything; until
+    the JSONL log exists it reads the legacy JSON array in its place.
+    """
+
+    def __init__(
+        self,
+        filename: Optional[str] = None,
+        legacy_filename: str = LEGACY_LOG_FILE,
+        segment_bytes: Optional[int] = None,
+        segment_hours: Optional[float] = None,
+        compression: Optional[str] = None,
+        read_only: bool = False,
+    ):
+        self.file_path = ROOT_DIR / (filename or default_log_file())
+        self.legacy_path = ROOT_DIR / legacy_filename if legacy_filename else None
+        self.segments_dir = self.file_path.with_suffix(".segments")
+        self.manifest_path = self.segments_dir / "manifest.json"
+        self.lock_path = self.file_path.with_suffix(".lock")
+        if segment_bytes is None:
+            segment_bytes = int(float(os.getenv("CALL_LOG_SEGMENT_MB", "16")) * 1024 * 1024)
+        if segment_hours is None:
+            segment_hours = float(os.getenv("CALL_LOG_SEGMENT_HOURS", "24"))
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_hours * 3600
+        self.compression = compression or os.getenv("CALL_LOG_COMPRESSION", "gzip")
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown call log compression: {self.compression}")
+        self.read_only = read_only
+        # Threads of this process; the flock only orders processes
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._listeners = []
+        self.segments = []
+        self._manifest_version = None
+        self._active = _empty_active()
+        self._legacy_calls = None
+
+        if read_only:
+            return
+        # Ensure directory exists
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            self.migrate_legacy()
+            self._refresh()
+            uncompressed = self._recover()
+        for name in uncompressed:
+            # Rotated but not compressed before the last shutdown
+            self._compress_later(name)
+
+    @contextmanager
+    def _locked(self, shared: bool = False):
+        """Hold this store's thread lock and the log's inter-process lock."""
+        with self._lock:
+            if self._lock_file is None:
+                if self.read_only and not self.lock_path.exists():
+                    # Nothing has written the log yet
+                    yield
+                    return
+                self._lock_file = open(self.lock_path, "r" if self.read_only else "a")
+            fcntl.flock(self._lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def migrate_legacy(self) -> int:
+        """Convert the old JSON array log into JSONL, once.
+
+        The legacy file is left in place; the migration only runs while the
+        JSONL log does not exist yet.
+        """
+        if self.file_path.exists() or not self.legacy_path or not self.legacy_path.exists():
+            return 0
+
+        calls = self._read_legacy()
+        if not calls:
+            return 0
+        tmp_path = self.file_path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w") as f:
+            for call in calls:
+                f.write(json.dumps(call) + "\n")
+        tmp_path.replace(self.file_path)
+
+        logger.info(f"Migrated {len(calls)} calls from {self.legacy_path} to {self.file_path}")
+        return len(calls)
+
+    def _read_legacy(self) -> List[dict]:
+        try:
+            with open(self.legacy_path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error(f"Error reading legacy JSON file: {e}")
+            return []
+
+    def _legacy_snapshot(self) -> List[tuple]:
+        """The legacy log as a single segment, for a read-only store before migration."""
+        if (
+            self.segments
+            or not self.legacy_path
+            or self.file_path.exists()
+            or not self.legacy_path.exists()
+        ):
+            return []
+        if self._legacy_calls is None:
+            # The legacy file is never written again, so it is read once
+            self._legacy_calls = self._read_legacy()
+        stats = {"count": len(self._legacy_calls), "start": None, "end": None, "legacy": True}
+        return [(self.legacy_path, None, stats)]
+
+    def _refresh(self):
+        """Catch up with writes by other processes; called with the lock held."""
+        try:
+            stat = self.manifest_path.stat()
+            version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            version = None
+        if version != self._manifest_version:
+            self.segments = self._read_manifest()
+            self._manifest_version = version
+
+        try:
+            stat = self.file_path.stat()
+        except FileNotFoundError:
+            self._active = _empty_active()
+            return
+        active = self._active
+        if stat.st_ino != active["inode"] or stat.st_size < active["bytes"]:
+            # Rotated by another process, or a new log
+            active = self._active = _empty_active()
+            active["inode"] = stat.st_ino
+        if stat.st_size > active["bytes"]:
+            lines = _read_lines(self.file_path, stat.st_size, active["bytes"])
+            for call in _parse_lines(lines, self.file_path.name):
+                self._count_active(call, _epoch(call.get("timestamp")))
+            active["bytes"] = stat.st_size
+
+    def _read_manifest(self) -> List[dict]:
+        if not self.manifest_path.exists():
+            return []
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)["segments"]
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.error(f"Error reading call log manifest: {e}")
+            return []
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"segments": self.segments}, f, indent=1)
+        tmp_path.replace(self.manifest_path)
+        stat = self.manifest_path.stat()
+        self._manifest_version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _recover(self) -> List[str]:
+        """Repair what a crash left behind; returns the segments still to compress.
+
+        Called with the lock held.
+        """
+        if not self.segments_dir.exists():
+            return []
+        listed = {segment["file"] for segment in self.segments}
+        numbers = {_segment_number(name) for name in listed}
+        recovered = False
+        for path in sorted(self.segments_dir.glob("*.jsonl")):
+            if path.name in listed:
+                continue
+            if _segment_number(path.name) in numbers:
+                # Left behind by a crash after compressing it
+                path.unlink()
+                continue
+            # A crash between moving a segment and writing the manifest leaves it unlisted
+            stats = _segment_stats(_parse_lines(_read_lines(path), path.name))
+            self.segments.append({"file": path.name, **stats})
+            logger.warning(f"Recovered unlisted call log segment {path.name}")
+            recovered = True
+        for path in self.segments_dir.glob("*.tmp"):
+            with open(path, "rb") as f:
+                try:
+                    # A compression still running in another process holds its file locked
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                path.unlink()
+        if recovered:
+            self.segments.sort(key=lambda segment: _segment_number(segment["file"]))
+            self._write_manifest()
+        return [segment["file"] for segment in self.segments if segment["file"].endswith(".jsonl")]
+
+    def _count_active(self, call_entry: dict, epoch: Optional[float]):
+        active = self._active
+        active["count"] += 1
+        if epoch is not None:
+            active["start"] = epoch if active["start"] is None else min(active["start"], epoch)
+            active["end"] = epoch if active["end"] is None else max(active["end"], epoch)
+
+    def _should_rotate(self, epoch: Optional[float]) -> bool:
+        active = self._active
+        if not active["count"]:
+            return False
+        if self.segment_bytes and active["bytes"] >= self.segment_bytes:
+            return True
+        return bool(
+            self.segment_seconds
+            and epoch is not None
+            and active["start"] is not None
+            and epoch - active["start"] >= self.segment_seconds
+        )
+
+    def _next_segment_path(self) -> Path:
+        numbers = [_segment_number(segment["file"]) for segment in self.segments]
+        if not self.read_only and self.segments_dir.exists():
+            # Never reuse the number of a file a crash left unlisted
+            numbers += [_segment_number(path.name) for path in self.segments_dir.glob("*.jsonl*")]
+        return self.segments_dir / f"{max(numbers, default=0) + 1:06d}.jsonl"
+
+    def _rotate(self):
+        """Move the active segment into the segments directory; called with the lock held."""
+        self.segments_dir.mkdir(exist_ok=True)
+        path = self._next_segment_path()
+        self.file_path.replace(path)
+        segment = {
+            "file": path.name,
+            "count": self._active["count"],
+            "start": self._active["start"],
+            "end": self._active["end"],
+        }
+        self.segments.append(segment)
+        self._write_manifest()
+        self._active = _empty_active()
+        logger.info(f"Rotated call log segment {path.name} with {segment['count']} calls")
+        self._compress_later(path.name)
+
+    def _compress_later(self, name: str):
+        threading.Thread(target=self._compress, args=(name,), daemon=True).start()
+
+    def _compress(self, name: str):
+        """Compress a rotated segment and point the manifest at the compressed file."""
+        path = self.segments_dir / name
+        suffix = ".gz" if self.compression == "gzip" else ".zst"
+        target = path.with_name(path.name + suffix)
+        tmp_path = target.with_name(target.name + ".tmp")
+        with self._locked():
+            try:
+                f = open(tmp_path, "xb")
+            except FileExistsError:
+                # Another process is compressing it
+                return
+            # Held until the compressed file is in place, so recovery leaves it alone
+            fcntl.flock(f, fcntl.LOCK_EX)
+        with f:
+            try:
+                with open(path, "rb") as source:
+                    if self.compression == "gzip":
+                        with gzip.GzipFile(fileobj=f, mode="wb") as compressed:
+                            shutil.copyfileobj(source, compressed, 1024 * 1024)
+                    else:
+                        import zstandard
+
+                        zstandard.ZstdCompressor().copy_stream(source, f)
+                f.flush()
+            except Exception as e:
+                logger.error(f"Error compressing call log segment {name}: {e}")
+                tmp_path.unlink(missing_ok=True)
+                return
+            with self._locked():
+                self._refresh()
+                segment = next((segment for segment in self.segments if segment["file"] == name), None)
+                if segment is None:
+                    tmp_path.unlink()
+                    return
+                tmp_path.replace(target)
+                segment["file"] = target.name
+                self._write_manifest()
+                # Readers that listed the uncompressed file fall back to the compressed one
+                path.unlink()
+
+    def append(self, call_entry: dict) -> None:
+        """Append a single call entry to the log, rotating the active segment first if it is full."""
+        if self.read_only:
+            raise PermissionError(f"{self.file_path} is open read-only")
+        line = json.dumps(call_entry) + "\n"
+        epoch = _epoch(call_entry.get("timestamp"))
+        with self._locked():
+            self._refresh()
+            if self._should_rotate(epoch):
+                self._rotate()
+            with open(self.file_path, "a") as f:
+                f.write(line)
+                f.flush()
+                stat = os.fstat(f.fileno())
+            self._count_active(call_entry, epoch)
+            self._active.update(bytes=stat.st_size, inode=stat.st_ino)
+            for listener in self._listeners:
+                try:
+                    listener(call_entry)
+                except Exception as e:
+                    logger.error(f"Error in call log listener: {e}")
+
+    def subscribe(self, listener: Callable[[dict], None], replay: bool = True, start: int = 0) -> None:
+        """Call `listener` with every entry appended by this process from now on.
+
+        With `replay`, the existing entries from position `start` on are
+        passed to it first; whole segments before `start` are skipped. The
+        replay runs outside the write lock, so saves are not held up: entries
+        saved meanwhile wait in a backlog and follow the replay, and none is
+        missed or seen twice. Live entries are passed on under the write lock,
+        so listeners should be quick.
+        """
+        if not replay:
+            with self._lock:
+                self._listeners.append(listener)
+            return
+
+        backlog = []
+        with self._locked(shared=True):
+            self._refresh()
+            snapshot = self._snapshot(None, None)
+            self._listeners.append(backlog.append)
+        for call_entry in self._iter_snapshot(snapshot, skip=start):
+            listener(call_entry)
+        while True:
+            with self._lock:
+                pending = list(backlog)
+                backlog.clear()
+                if not pending:
+                    self._listeners[self._listeners.index(backlog.append)] = listener
+                    return
+            for call_entry in pending:
+                listener(call_entry)
+
+    def _snapshot(self, since: Optional[float], until: Optional[float]) -> List[tuple]:
+        """The segments overlapping [since, until) as (path, size, stats); called with the lock held.
+
+        The active segment is included with its current size, so appends after
+        this point do not change what is read. If it is rotated meanwhile, it
+        is read from where the rotation moved it.
+        """
+        snapshot = []
+        for segment in self.segments:
+            snapshot.append((self.segments_dir / segment["file"], None, dict(segment)))
+        if self._active["count"]:
+            stats = {**self._active, "rotated_to": self._next_segment_path()}
+            snapshot.append((self.file_path, self._active["bytes"], stats))
+        return [
+            entry
+            for entry in snapshot
+            if entry[2]["start"] is None
+            or (
+                (since is None or entry[2]["end"] >= since)
+                and (until is None or entry[2]["start"] < until)
+            )
+        ]
+
+    def _take_snapshot(self, since: Optional[float], until: Optional[float]) -> List[tuple]:
+        with self._locked(shared=True):
+            self._refresh()
+            if self.read_only:
+                return self._legacy_snapshot() or self._snapshot(since, until)
+            return self._snapshot(since, until)
+
+    def _open_segment(self, path: Path, size: Optional[int], stats: dict) -> tuple:
+        """Open a snapshotted segment wherever rotation or compression has moved it since."""
+        candidates = []
+        if "rotated_to" in stats:
+            candidates.append((path, size))
+            path = stats["rotated_to"]
+        candidates.append((path, size))
+        if path.suffix == ".jsonl":
+            candidates += [(path.with_name(path.name + suffix), None) for suffix in (".gz", ".zst")]
+        for candidate, candidate_size in candidates:
+            try:
+                f = open(candidate, "rb")
+            except FileNotFoundError:
+                continue
+            if candidate == self.file_path and os.fstat(f.fileno()).st_ino != stats["inode"]:
+                # A new active segment; the snapshotted one was rotated
+                f.close()
+                continue
+            return f, candidate, candidate_size
+        return None, path, size
+
+    def _iter_snapshot(
+        self,
+        snapshot: List[tuple],
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        skip: int = 0,
+    ) -> Iterator[dict]:
+        while snapshot and skip >= snapshot[0][2]["count"]:
+            skip -= snapshot[0][2]["count"]
+            snapshot = snapshot[1:]
+        if skip:
+            yield from itertools.islice(self._iter_snapshot(snapshot, since, until), skip, None)
+            return
+        for path, size, stats in snapshot:
+            if stats.get("legacy"):
+                yield from self._in_window(iter(self._legacy_calls), stats, since, until)
+                continue
+            f, path, size = self._open_segment(path, size, stats)
+            if f is None:
+                logger.error(f"Call log segment {path.name} is missing")
+                continue
+            with f:
+                calls = _parse_lines(_map_lines(f, path, size), path.name)
+                yield from self._in_window(calls, stats, since, until)
+
+    @staticmethod
+    def _in_window(calls: Iterator[dict], stats: dict, since: Optional[float], until: Optional[float]):
+        inside = (
+            stats["start"] is not None
+            and (since is None or stats["start"] >= since)
+            and (until is None or stats["end"] < until)
+        )
+        if inside or (since is None and until is None):
+            yield from calls
+            return
+        # Only segments straddling the window are filtered call by call
+        for call in calls:
+            epoch = _epoch(call.get("timestamp"))
+            if epoch is not None and (since is None or epoch >= since) and (until is None or epoch < until):
+                yield call
+
+    def iter_calls(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[dict]:
+        """Stream call entries in the order they were saved.
+
+        With `since`/`until` (epoch seconds), only calls in [since, until) are
+        returned, and segments entirely outside the window are not read.
+        """
+        snapshot = self._take_snapshot(since, until)
+        yield from self._iter_snapshot(snapshot, since, until)
+
+    def load_calls(
+        self,
+        limit: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[dict]:
+        """Return saved calls, or only the most recent `limit` of them.
+
+        For the most recent calls only the newest segments holding at least
+        `limit` entries are read.
+        """
+        snapshot = self._take_snapshot(since, until)
+        if limit is not None and limit <= 0:
+            return []
+        if limit is not None and since is None and until is None:
+            needed = 0
+            for first in range(len(snapshot) - 1, -1, -1):
+                needed += snapshot[first][2]["count"]
+                if needed >= limit:
+                    snapshot = snapshot[first:]
+                    break
+        calls = list(self._iter_snapshot(snapshot, since, until))
+        if limit is not None:
+            calls = calls[-limit:]
+        return calls
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_call_log_store(filename: Optional[str] = None, read_only: bool = False) -> CallLogStore:
+    """Return the shared store for `filename`, creating it on first use.
+
+    Tools that only read the log should pass `read_only`, so they never
+    touch the files of a running app. The legacy JSON log is looked for next
+    to `filename`, with a .json suffix.
+    """
+    filename = filename or default_log_file()
+    with _stores_lock:
+        store = _stores.get((filename, read_only))
+        if store is None:
+            legacy_filename = str(Path(filename).with_suffix(".json"))
+            store = CallLogStore(filename, legacy_filename, read_only=read_only)
+            _stores[(filename, read_only)] = store
+        return store
+
+
+def build_call_entry(call_text: str, response_data: dict, call_sid: Optional[str] = None) -> dict:
     try:
         call_entry = {
             "timestamp": datetime.now().isoformat(),
@@ -20,24 +614,28 @@ def save_call_to_json(
     except Exception as e:
         logger.error(f"Error creating call entry: {e}")
         raise
+    if response_data.get("degraded"):
+        call_entry["degraded"] = True
+    if call_sid:
+        call_entry["call_sid"] = call_sid
+    return call_entry
 
-    # Get project root directory
-    root_dir = Path(__file__).parent.parent.parent
-    file_path = root_dir / filename
 
-    # Ensure directory exists
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+def save_call_to_json(
+    call_text: str,
+    response_data: dict,
+    filename: Optional[str] = None,
+    call_sid: Optional[str] = None,
+) -> None:
+    call_entry = build_call_entry(call_text, response_data, call_sid)
+    get_call_log_store(filename).append(call_entry)
 
-    # Load existing data or create new list
-    calls = []
-    if file_path.exists():
-        try:
-            with open(file_path, "r") as f:
-                calls = json.load(f)
-        except json.JSONDecodeError as e:
-            logger.error(f"Error reading JSON file: {e}")
 
-    # Append new call and save
-    calls.append(call_entry)
-    with open(file_path, "w") as f:
-        json.dump(calls, f, indent=2)
\ No newline at end of file
+def load_calls(
+    limit: Optional[int] = None,
+    filename: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+) -> List[dict]:
+    """Reader API for the dashboard and analytics."""
+    return get_call_log_store(filename).load_calls(limit, since, until)
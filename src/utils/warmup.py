@@ -0,0 +1,32 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def import_sdks():
+    """Import LangChain/OpenAI and the Twilio REST client ahead of the first call."""
+    import src.services.llm.classifier  # noqa: F401
+    import twilio.rest  # noqa: F401
+
+
+def warm_up(*steps):
+    """Run each warm-up step, logging rather than raising failures."""
+    started = time.perf_counter()
+    for step in (import_sdks,) + steps:
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"Error during warm-up step {step.__name__}: {e}")
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+
+def start_warm_up(*steps) -> threading.Thread:
+    """Warm up in a background thread, unless WARM_UP=false."""
+    if os.getenv("WARM_UP", "true").lower() not in ("1", "true", "yes"):
+        return None
+    thread = threading.Thread(target=warm_up, args=steps, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,21 @@
+from src.services.analytics import CallLogIndex
+from src.utils.storage import build_call_entry
+
+
+def test_degraded_calls_are_logged_but_not_counted():
+    degraded = build_call_entry(
+        "someone is shouting",
+        {"priority": "ORANGE", "department": "POLICEDEPT", "summary": "operator review",
+         "confidence": 0, "degraded": True},
+    )
+    assert degraded["degraded"] is True
+    classified = build_call_entry(
+        "my house is on fire",
+        {"priority": "RED", "department": "FIRDEPT", "summary": "house fire", "confidence": 95},
+    )
+    assert "degraded" not in classified
+
+    index = CallLogIndex()
+    index.extend([degraded, classified])
+    assert index.counts()["by_priority"] == {"RED": 1}
+    assert index.confidence_distribution()["count"] == 1
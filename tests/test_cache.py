@@ -0,0 +1,22 @@
+import pytest
+
+from src.services.llm.cache import normalize_transcript
+
+
+@pytest.mark.parametrize("call_text, key", [
+    ("My dog is missing.", "my dog is missing"),
+    ("Umm, my dog is missing!", "my dog is missing"),
+    ("Uh... there's a FIRE in the kitchen", "theres fire in kitchen"),
+    ("Hmm, er, an accident on the highway", "accident on highway"),
+    ("He's not well", "hes not well"),
+    ("She's gone", "shes gone"),
+    ("It's just like a cut", "its just like cut"),
+    ("There is no gun", "there is no gun"),
+])
+def test_normalize_transcript(call_text, key):
+    assert normalize_transcript(call_text) == key
+
+
+def test_meaningful_words_keep_calls_apart():
+    assert normalize_transcript("He is well") != normalize_transcript("He is")
+    assert normalize_transcript("She's gone") != normalize_transcript("She's")
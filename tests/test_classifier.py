@@ -0,0 +1,81 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.services.llm.classifier import CLASSIFY_TOOL, bind_output_mode, decode_response
+from src.services.llm.result import CLASSIFICATION_SCHEMA, ClassificationError, Department, EmergencyPriority
+
+ARGS = {"priority": "RED", "department": "EMS", "summary": "not breathing", "confidence": 95}
+
+
+def test_decodes_the_tool_call_arguments():
+    response = AIMessage(content="", tool_calls=[{"name": "classify_call", "args": ARGS, "id": "call_1"}])
+    result = decode_response(response)
+    assert (result.priority, result.department, result.confidence) == (EmergencyPriority.RED, Department.EMS, 95)
+
+
+def test_decodes_an_invalid_tool_call_from_its_raw_arguments():
+    # LangChain keeps arguments it could not parse as JSON as a string
+    response = AIMessage(
+        content="",
+        invalid_tool_calls=[{
+            "name": "classify_call",
+            "args": 'Sure: {"priority": "GREEN", "summary": "lost cat", "confidence": "70"}',
+            "id": "call_1",
+            "error": None,
+        }],
+    )
+    result = decode_response(response)
+    assert (result.priority, result.department, result.confidence) == (
+        EmergencyPriority.GREEN, Department.POLICEDEPT, 70
+    )
+
+
+def test_rejects_an_invalid_tool_call_without_a_classification():
+    response = AIMessage(
+        content="", invalid_tool_calls=[{"name": "classify_call", "args": None, "id": "call_1", "error": None}]
+    )
+    with pytest.raises(ClassificationError):
+        decode_response(response)
+
+
+def test_decodes_json_content():
+    response = AIMessage(content='```json\n{"priority": "ORANGE", "department": "FIRDEPT", "confidence": 60}\n```')
+    assert decode_response(response).priority is EmergencyPriority.ORANGE
+
+
+def test_rejects_an_empty_response():
+    with pytest.raises(ClassificationError, match="no classification"):
+        decode_response(AIMessage(content=""))
+
+
+class BindingLLM:
+    def __init__(self):
+        self.bound = None
+
+    def bind_tools(self, tools, tool_choice=None):
+        self.bound = ("tools", tools, tool_choice)
+        return self
+
+    def bind(self, **kwargs):
+        self.bound = ("bind", kwargs)
+        return self
+
+
+def test_tools_mode_forces_the_classify_call_function():
+    llm = BindingLLM()
+    bind_output_mode(llm, "tools")
+    assert llm.bound == ("tools", [CLASSIFY_TOOL], "classify_call")
+
+
+def test_json_schema_mode_binds_a_strict_schema():
+    llm = BindingLLM()
+    bind_output_mode(llm, "json_schema")
+    response_format = llm.bound[1]["response_format"]
+    assert response_format["json_schema"]["strict"] is True
+    assert response_format["json_schema"]["schema"] is CLASSIFICATION_SCHEMA
+
+
+def test_text_mode_leaves_the_model_unbound():
+    llm = BindingLLM()
+    assert bind_output_mode(llm, "text") is llm
+    assert llm.bound is None
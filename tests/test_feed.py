@@ -0,0 +1,60 @@
+import pytest
+
+from src.services.feed import LiveFeed, RedisLiveFeed
+
+
+@pytest.fixture(params=["memory", "redis"])
+def make_feed(request):
+    if request.param == "memory":
+        return LiveFeed
+    fakeredis = pytest.importorskip("fakeredis")
+    return lambda max_calls=100: RedisLiveFeed(fakeredis.FakeRedis(), max_calls)
+
+
+def test_updates_merge_into_one_card_per_call(make_feed):
+    feed = make_feed()
+    assert feed.publish({"call_id": "CA1", "priority": "RED"})["seq"] == 1
+    assert feed.publish({"call_id": "CA2", "priority": "GREEN"})["seq"] == 2
+    feed.publish({"call_id": "CA1", "summary": "fire"})
+
+    state = feed.state()
+    assert state["seq"] == 3
+    assert state["reset"] is True
+    assert [(call["call_id"], call.get("priority"), call.get("summary"), call["seq"]) for call in state["calls"]] == [
+        ("CA2", "GREEN", None, 2),
+        ("CA1", "RED", "fire", 3),
+    ]
+    changed = feed.state(since=2)
+    assert changed["reset"] is False
+    assert [call["call_id"] for call in changed["calls"]] == ["CA1"]
+
+
+def test_evicted_calls_reset_clients_that_saw_them(make_feed):
+    feed = make_feed(max_calls=2)
+    for call_id in ("CA1", "CA2", "CA3"):
+        feed.publish({"call_id": call_id, "priority": "RED"})
+    assert [call["call_id"] for call in feed.state()["calls"]] == ["CA2", "CA3"]
+    assert feed.state(since=0)["reset"] is True
+    assert feed.state(since=2)["reset"] is False
+
+
+def test_partial_updates_never_replace_the_final_classification(make_feed):
+    feed = make_feed()
+    assert feed.publish({"call_id": "CA1", "priority": "ORANGE", "partial": True})["partial"] is True
+    final = feed.publish({"call_id": "CA1", "priority": "GREEN"})
+    assert final["partial"] is False
+
+    assert feed.publish({"call_id": "CA1", "priority": "RED", "partial": True}) is None
+    [call] = feed.state()["calls"]
+    assert call["priority"] == "GREEN"
+    assert call["seq"] == final["seq"]
+
+
+def test_workers_sharing_redis_see_one_sequence():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    first = RedisLiveFeed(fakeredis.FakeRedis(server=server))
+    second = RedisLiveFeed(fakeredis.FakeRedis(server=server))
+    assert first.publish({"call_id": "CA1", "priority": "RED"})["seq"] == 1
+    assert second.publish({"call_id": "CA2", "priority": "RED"})["seq"] == 2
+    assert [call["call_id"] for call in first.state(since=1)["calls"]] == ["CA2"]
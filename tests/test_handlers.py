@@ -0,0 +1,37 @@
+import pytest
+
+from src.services import sessions
+from src.services.twilio import handlers
+from src.services.twilio.handlers import TwilioHandler
+
+
+class Queue:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, speech_result, session=None):
+        # Classified later; nothing is recorded on the session yet
+        self.jobs.append((speech_result, session))
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setenv("TWILIO_ACCOUNT_SID", "AC123")
+    monkeypatch.setenv("TWILIO_AUTH_TOKEN", "token")
+    monkeypatch.delenv("MEDIA_STREAM_URL", raising=False)
+    monkeypatch.setattr(sessions, "_sessions", None)
+    return TwilioHandler()
+
+
+def test_follow_up_prompt_while_an_async_turn_is_classified(handler, monkeypatch):
+    queue = Queue()
+    monkeypatch.setenv("ASYNC_SPEECH_PROCESSING", "true")
+    monkeypatch.setattr(handlers, "get_job_queue", lambda process, socketio: queue)
+
+    assert "what is your emergency" in handler.handle_incoming_call("CA1")
+    handler.handle_speech_processing("my neighbor's house is on fire", None, "CA1")
+    assert len(queue.jobs) == 1
+
+    answer = handler.handle_incoming_call("CA1")
+    assert "anything else" in answer
+    assert "what is your emergency" not in answer
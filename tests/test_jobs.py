@@ -0,0 +1,68 @@
+import time
+import threading
+
+from src.services.jobs import SpeechJobQueue
+from src.services.llm.result import Classification, Department, EmergencyPriority
+from src.services.sessions import CallSession
+
+
+class Socket:
+    def emit(self, event, data):
+        pass
+
+
+class Recorder:
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+        self.order = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, speech_result, on_update=None, previous=None, call_sid=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+            self.order.append(speech_result)
+        return Classification(EmergencyPriority.GREEN, Department.POLICEDEPT, "noted", 90)
+
+
+def test_turns_of_a_call_stay_in_order_and_calls_go_by_priority():
+    gate = threading.Event()
+    process = Recorder(gate)
+    queue = SpeechJobQueue(process, Socket(), num_workers=1)
+    queue.submit("please hold", CallSession("CA0"))
+    time.sleep(0.05)
+    a, b, c = CallSession("CA1"), CallSession("CA2"), CallSession("CA3")
+    queue.submit("someone keeps following me", a)
+    queue.submit("now he has a gun", a)
+    queue.submit("my cat is lost", b)
+    queue.submit("the garage is on fire", c)
+    assert queue.depth() == 4
+    gate.set()
+    queue.shutdown()
+    assert process.order == [
+        "please hold",
+        "someone keeps following me",
+        "the garage is on fire",
+        "now he has a gun",
+        "my cat is lost",
+    ]
+    assert queue.depth() == 0
+
+
+def test_one_call_is_classified_one_turn_at_a_time():
+    process = Recorder()
+    queue = SpeechJobQueue(process, Socket(), num_workers=4)
+    session = CallSession("CA1")
+    turns = [f"turn {i}" for i in range(6)]
+    for turn in turns:
+        queue.submit(turn, session)
+    queue.shutdown()
+    assert process.order == turns
+    assert process.max_running == 1
@@ -0,0 +1,65 @@
+from src.services.llm.backends import LocalBackend
+from src.services.llm.local_model import TfidfCentroidModel, _margin
+
+CALLS = [
+    {"call_text": text, "priority": priority, "department": department, "summary": "logged", "confidence": 90}
+    for text, priority, department in [
+        ("my house is on fire", "RED", "FIRDEPT"),
+        ("the kitchen is on fire and full of smoke", "RED", "FIRDEPT"),
+        ("fire in the garage flames everywhere", "RED", "FIRDEPT"),
+        ("there is smoke and fire next door", "RED", "FIRDEPT"),
+        ("my dad is bleeding a lot", "RED", "EMS"),
+        ("blood everywhere he is bleeding", "RED", "EMS"),
+        ("i lost my cat", "GREEN", "POLICEDEPT"),
+        ("my cat is lost again", "GREEN", "POLICEDEPT"),
+        ("the neighbors dog is lost", "GREEN", "POLICEDEPT"),
+        ("noise complaint about the party next door", "GREEN", "POLICEDEPT"),
+        ("loud music noise from the party", "GREEN", "POLICEDEPT"),
+        ("my bike was stolen yesterday", "ORANGE", "POLICEDEPT"),
+        ("someone stole my car yesterday", "ORANGE", "POLICEDEPT"),
+    ]
+]
+
+
+def test_training_skips_degraded_and_placeholder_calls():
+    model = TfidfCentroidModel.train(CALLS + [
+        {"call_text": "strange alarm", "priority": "RED", "department": "POLICEDEPT", "degraded": True},
+        {"call_text": "odd humming", "priority": "ORANGE", "department": "POLICEDEPT",
+         "summary": "operator review", "confidence": 0},
+    ])
+    assert "alarm" not in model.idf
+    assert "humming" not in model.idf
+
+
+def test_confidence_is_calibrated_on_held_out_calls():
+    model = TfidfCentroidModel.train(CALLS)
+    margins = [margin for margin, _ in model.calibration]
+    accuracies = [accuracy for _, accuracy in model.calibration]
+    assert margins == sorted(margins)
+    assert accuracies == sorted(accuracies)
+    assert 0 < accuracies[-1] < 1
+    assert model.confidence(-1) == 0
+    assert model.confidence(1) == accuracies[-1]
+
+
+def test_unknown_words_lower_the_margin():
+    model = TfidfCentroidModel.train(CALLS)
+    _, known = model._scores("party")
+    _, mostly_unknown = model._scores("a man came by the party with a ladder and a van and left")
+    assert _margin(mostly_unknown["priority"]) < _margin(known["priority"]) / 2
+
+
+def test_summary_and_features_skip_stop_words():
+    model = TfidfCentroidModel.train(CALLS)
+    assert model.predict("there is a man with a gun") is None
+    assert sorted(model.predict("is there a fire in the house")["summary"].split()) == ["fire", "house"]
+
+
+def test_local_backend_passes_on_predictions_at_the_threshold(tmp_path):
+    model = TfidfCentroidModel.train(CALLS)
+    model.save(tmp_path / "model.json")
+    confidence = int(model.predict("my cat is lost")["confidence"])
+    backend = LocalBackend(model_file=str(tmp_path / "model.json"), min_confidence=confidence)
+    assert backend.classify("my cat is lost") is None
+    backend.min_confidence = confidence - 1
+    assert backend.classify("my cat is lost").priority.name == "GREEN"
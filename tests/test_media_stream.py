@@ -0,0 +1,95 @@
+import time
+import base64
+
+from src.services.llm.result import Classification, Department, EmergencyPriority
+from src.services.transcription import StubTranscriber
+from src.services.twilio.media_stream import AudioRingBuffer, MediaStream
+
+
+def contents(views) -> bytes:
+    return b"".join(bytes(view) for view in views)
+
+
+def test_views_are_not_overwritten_before_commit():
+    buffer = AudioRingBuffer(8)
+    buffer.write(b"AAAAAAAA")
+    views = buffer.read()
+    buffer.write(b"BBBB")
+    assert contents(views) == b"AAAAAAAA"
+    assert buffer.dropped == 4
+
+    buffer.commit(8)
+    buffer.write(b"CCCC")
+    assert contents(buffer.read()) == b"CCCC"
+
+
+def test_read_wraps_around():
+    buffer = AudioRingBuffer(8)
+    buffer.write(b"123456")
+    buffer.commit(len(contents(buffer.read())))
+    buffer.write(b"abcdef")
+    views = buffer.read()
+    assert len(views) == 2
+    assert contents(views) == b"abcdef"
+    assert buffer.dropped == 0
+
+
+def test_read_after_close_drains_then_ends():
+    buffer = AudioRingBuffer(8)
+    buffer.write(b"xy")
+    buffer.close()
+    views = buffer.read()
+    assert contents(views) == b"xy"
+    buffer.commit(2)
+    assert buffer.read() == []
+
+
+class Socket:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, data):
+        self.emitted.append((event, data))
+
+
+class Classifier:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, transcript):
+        self.calls.append((time.monotonic(), transcript))
+        return Classification(EmergencyPriority.ORANGE, Department.POLICEDEPT, "partial", 50)
+
+
+def media(size: int) -> dict:
+    return {"event": "media", "media": {"track": "inbound", "payload": base64.b64encode(b"\xff" * size).decode()}}
+
+
+def test_partial_classifications_are_paced_and_published_for_the_call():
+    socket = Socket()
+    classify = Classifier()
+    words = [f"word{i}" for i in range(12)]
+    # One word per 800 bytes, a tenth of a second of audio
+    transcriber = StubTranscriber(" ".join(words), words_per_second=10)
+    stream = MediaStream(socket, transcriber, classify, min_new_words=3, min_interval=0.2)
+
+    assert stream.handle({"event": "start", "start": {"callSid": "CAstream1", "streamSid": "MZ1"}})
+    for _ in words:
+        stream.handle(media(800))
+        time.sleep(0.05)
+    assert not stream.handle({"event": "stop"})
+    stream.close()
+
+    assert all(not thread.is_alive() for thread in stream._threads)
+    assert len(classify.calls) >= 2
+    counts = [len(transcript.split()) for _, transcript in classify.calls]
+    assert counts[0] >= 3
+    assert all(later - earlier >= 3 for earlier, later in zip(counts, counts[1:]))
+    times = [at for at, _ in classify.calls]
+    assert all(later - earlier >= 0.2 for earlier, later in zip(times, times[1:]))
+
+    assert [event for event, _ in socket.emitted] == ["classification_update"] * len(classify.calls)
+    for (_, transcript), (_, update) in zip(classify.calls, socket.emitted):
+        assert update["call_id"] == "CAstream1"
+        assert update["partial"] is True
+        assert update["transcript"] == transcript
@@ -0,0 +1,86 @@
+import time
+import threading
+
+import pytest
+
+from src.services.llm.resilience import CircuitBreaker, ResilientLLM
+
+
+class StubLLM:
+    def __init__(self, chunks, delay: float = 0.0):
+        self.chunks = chunks
+        self.delay = delay
+
+    def stream(self, messages):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield chunk
+
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_rate=0.5, min_requests=1, cooldown=0)
+    breaker.record(False)
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_stream_yields_chunks_and_closes_the_circuit():
+    breaker = half_open_breaker()
+    llm = ResilientLLM(StubLLM(["a", "b"]), deadline=1, breaker=breaker)
+    assert list(llm.stream([])) == ["a", "b"]
+    assert breaker.state == "closed"
+
+
+def test_stream_enforces_the_deadline():
+    llm = ResilientLLM(StubLLM(["a", "b"], delay=3), deadline=0.2)
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        list(llm.stream([]))
+    assert time.perf_counter() - started < 1
+    assert llm.stats()["timeouts"] == 1
+
+
+def test_stream_closed_early_ends_the_half_open_trial():
+    breaker = half_open_breaker()
+    llm = ResilientLLM(StubLLM(["a", "b"]), deadline=1, breaker=breaker)
+    stream = llm.stream([])
+    assert next(stream) == "a"
+    stream.close()
+    assert breaker.state == "open"
+    # The trial is over, so after the cooldown another one is allowed
+    assert breaker.allow()
+
+
+class SlowLLM:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return "ok"
+
+
+def test_hedges_and_abandoned_attempts_stay_within_the_pool():
+    slow = SlowLLM(delay=0.6)
+    llm = ResilientLLM(slow, deadline=0.5, max_workers=1)
+    # Warm the latency window so every attempt is hedged right away
+    llm._latencies.extend([0.0] * llm.hedge_min_samples)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            llm.invoke([])
+        assert llm.stats()["in_flight"] <= 1
+    time.sleep(0.7)
+    assert slow.max_running == 1
+    # Hedges left waiting for the one thread were never sent
+    assert slow.calls == 2
+    assert llm.stats()["in_flight"] == 0
@@ -0,0 +1,84 @@
+import pytest
+
+from src.services.llm.result import (
+    Classification,
+    ClassificationError,
+    Department,
+    EmergencyPriority,
+    parse_confidence,
+)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (90, 90),
+    ("90", 90),
+    (" 90% ", 90),
+    ("0.9", 90),
+    (0.9, 90),
+    ("1.0", 100),
+    ("87.6", 88),
+    (150, 100),
+    (-5, 0),
+])
+def test_parse_confidence(value, expected):
+    assert parse_confidence(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "high", "90 percent", [90]])
+def test_parse_confidence_rejects_invalid_values(value):
+    with pytest.raises(ClassificationError):
+        parse_confidence(value)
+
+
+def test_from_dict_normalizes_the_fields():
+    result = Classification.from_dict(
+        {"priority": " red ", "department": "ems", "summary": "man down", "confidence": "90%"}
+    )
+    assert result == Classification(EmergencyPriority.RED, Department.EMS, "man down", 90)
+
+
+def test_from_dict_defaults_a_missing_department_to_police():
+    result = Classification.from_dict({"priority": "GREEN", "summary": "lost cat", "confidence": 70})
+    assert result.department is Department.POLICEDEPT
+
+
+def test_from_dict_accepts_the_old_fire_department_spelling():
+    result = Classification.from_dict({"priority": "RED", "department": "FIREDEPT", "confidence": 90})
+    assert result.department is Department.FIRDEPT
+    assert result.to_dict()["department"] == "FIRDEPT"
+
+
+@pytest.mark.parametrize("data", [
+    {"department": "EMS", "confidence": 90},
+    {"priority": "PURPLE", "department": "EMS", "confidence": 90},
+    {"priority": "RED", "department": "COAST_GUARD", "confidence": 90},
+    {"priority": "RED", "department": "EMS", "confidence": "very"},
+])
+def test_from_dict_rejects_invalid_values(data):
+    with pytest.raises(ClassificationError):
+        Classification.from_dict(data)
+
+
+EXPECTED = Classification(EmergencyPriority.RED, Department.FIRDEPT, "house fire", 95)
+
+
+@pytest.mark.parametrize("text", [
+    '{"priority": "RED", "department": "FIRDEPT", "summary": "house fire", "confidence": 95}',
+    '```json\n{"priority": "RED", "department": "FIRDEPT", "summary": "house fire", "confidence": 95}\n```',
+    '```\n{"priority": "RED", "department": "FIRDEPT", "summary": "house fire", "confidence": "95"}\n```',
+    'Here is the classification: {"priority": "RED", "department": "FIRDEPT", '
+    '"summary": "house fire", "confidence": 95} Stay safe.',
+])
+def test_from_json_decodes_completions(text):
+    assert Classification.from_json(text) == EXPECTED
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "RED, FIRDEPT, house fire",
+    '["RED", "FIRDEPT"]',
+    '{"priority": "RED", "department": ',
+])
+def test_from_json_rejects_non_objects(text):
+    with pytest.raises(ClassificationError):
+        Classification.from_json(text)
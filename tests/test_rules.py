@@ -0,0 +1,31 @@
+import pytest
+
+from src.services.llm.rules import classify_by_rules, suspected_priority
+
+
+@pytest.mark.parametrize("call_text", [
+    "There is no gun",
+    "Nobody is bleeding, it was a minor fender bender",
+    "My phone is dying",
+    "I need to book a flu shot",
+    "My eyes are burning from the pool",
+    "The house is not on fire anymore",
+])
+def test_negated_and_everyday_phrases_go_to_the_llm(call_text):
+    assert classify_by_rules(call_text) is None
+
+
+@pytest.mark.parametrize("call_text, priority, department", [
+    ("He has a gun", "RED", "POLICEDEPT"),
+    ("My dad is bleeding", "RED", "EMS"),
+    ("The kitchen is on fire", "RED", "FIRDEPT"),
+    ("I lost my cat", "GREEN", "POLICEDEPT"),
+])
+def test_clear_cut_calls_are_classified(call_text, priority, department):
+    result = classify_by_rules(call_text)
+    assert (result.priority.name, result.department.name) == (priority, department)
+
+
+def test_negated_triggers_do_not_raise_the_suspected_priority():
+    assert suspected_priority("Nobody is bleeding") == "ORANGE"
+    assert suspected_priority("He was shot") == "RED"
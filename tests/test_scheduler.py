@@ -0,0 +1,42 @@
+import pytest
+
+from src.services.llm.backends import BackendChain, ClassifierBackend, DegradedBackend
+from src.services.llm.scheduler import ClassificationScheduler
+
+
+def test_acquire_gives_up_after_the_timeout():
+    scheduler = ClassificationScheduler(max_in_flight=1, timeout=0.05)
+    with scheduler.slot("my cat is lost"):
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("RED")
+    stats = scheduler.stats()["priorities"]["RED"]
+    assert (stats["waiting"], stats["timed_out"]) == (0, 1)
+    # The abandoned ticket does not block later callers
+    with scheduler.slot("my cat is lost"):
+        assert scheduler.in_flight == 1
+
+
+def test_backend_chain_falls_through_when_no_slot_frees_up():
+    scheduler = ClassificationScheduler(max_in_flight=1, timeout=0.05)
+
+    class Queued(ClassifierBackend):
+        name = "queued"
+
+        def classify(self, call_text, on_update=None, previous=None):
+            with scheduler.slot(call_text):
+                raise AssertionError("should not get a slot")
+
+    with scheduler.slot("busy"):
+        result = BackendChain([Queued(), DegradedBackend()]).classify("someone is shouting outside")
+    assert result.degraded
+
+
+def test_shared_scheduler_reads_the_environment_on_first_use(monkeypatch):
+    from src.services.llm import scheduler
+
+    monkeypatch.setattr(scheduler, "_scheduler", None)
+    monkeypatch.setenv("LLM_MAX_IN_FLIGHT", "2")
+    monkeypatch.setenv("LLM_QUEUE_TIMEOUT", "1")
+    shared = scheduler.get_scheduler()
+    assert (shared.max_in_flight, shared.timeout) == (2, 1.0)
+    assert scheduler.get_scheduler() is shared
@@ -0,0 +1,30 @@
+from src.services.search import CallSearchIndex
+from src.utils.storage import CallLogStore
+
+
+def call(i: int, text: str) -> dict:
+    return {"timestamp": f"2026-01-01T00:00:{i:02d}", "call_text": text, "summary": "", "priority": "RED"}
+
+
+def test_index_catches_up_and_follows_the_log(tmp_path):
+    store = CallLogStore(str(tmp_path / "calls.jsonl"), None, segment_bytes=300, segment_hours=0)
+    for i in range(10):
+        store.append(call(i, f"fire number {i}"))
+
+    index = CallSearchIndex(tmp_path / "search.db", batch_size=4)
+    store.subscribe(index.on_call_saved, start=index.indexed)
+    store.append(call(10, "a man with a gun"))
+    index.flush()
+    assert index.indexed == 11
+    assert index.search("fire")["total"] == 10
+    assert index.search("gun")["total"] == 1
+
+    # After a restart only the calls saved since are indexed
+    store = CallLogStore(str(tmp_path / "calls.jsonl"), None, segment_bytes=300, segment_hours=0)
+    store.append(call(11, "another gun"))
+    restarted = CallSearchIndex(tmp_path / "search.db")
+    assert restarted.indexed == 11
+    store.subscribe(restarted.on_call_saved, start=restarted.indexed)
+    restarted.flush()
+    assert restarted.indexed == 12
+    assert restarted.search("gun")["total"] == 2
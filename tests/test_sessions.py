@@ -0,0 +1,10 @@
+from src.services import sessions
+
+
+def test_shared_store_reads_the_environment_on_first_use(monkeypatch):
+    monkeypatch.setattr(sessions, "_sessions", None)
+    monkeypatch.setenv("CALL_SESSIONS_MAX", "5")
+    monkeypatch.setenv("CALL_SESSION_TTL", "5")
+    store = sessions.get_session_store()
+    assert (store.max_sessions, store.ttl) == (5, 5.0)
+    assert sessions.get_session_store() is store
@@ -0,0 +1,194 @@
+import json
+import time
+import fcntl
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.storage import CallLogStore
+
+BASE = datetime(2026, 1, 1)
+
+
+def entry(i: int) -> dict:
+    return {"timestamp": (BASE + timedelta(minutes=i)).isoformat(), "i": i}
+
+
+def open_store(tmp_path, **kwargs) -> CallLogStore:
+    kwargs.setdefault("segment_bytes", 300)
+    kwargs.setdefault("segment_hours", 0)
+    return CallLogStore(str(tmp_path / "calls.jsonl"), None, **kwargs)
+
+
+def manifest(tmp_path) -> list:
+    with open(tmp_path / "calls.segments" / "manifest.json") as f:
+        return json.load(f)["segments"]
+
+
+def wait_for_compression(tmp_path, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(segment["file"].endswith(".gz") for segment in manifest(tmp_path)):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"Segments not compressed: {manifest(tmp_path)}")
+
+
+def test_rotates_into_compressed_segments(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(40):
+        store.append(entry(i))
+    wait_for_compression(tmp_path)
+
+    segments = manifest(tmp_path)
+    assert len(segments) > 1
+    assert [segment["file"] for segment in segments] == [f"{n:06d}.jsonl.gz" for n in range(1, len(segments) + 1)]
+    assert sum(segment["count"] for segment in segments) + store._active["count"] == 40
+    assert [call["i"] for call in store.iter_calls()] == list(range(40))
+
+
+def test_time_window_and_limit(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(40):
+        store.append(entry(i))
+    since = (BASE + timedelta(minutes=10)).timestamp()
+    until = (BASE + timedelta(minutes=15)).timestamp()
+    assert [call["i"] for call in store.load_calls(since=since, until=until)] == list(range(10, 15))
+    assert [call["i"] for call in store.load_calls(3)] == [37, 38, 39]
+
+
+def test_rotates_by_age(tmp_path):
+    store = open_store(tmp_path, segment_bytes=0, segment_hours=1)
+    for i in range(0, 150, 10):
+        store.append(entry(i))
+    assert [(segment["start"], segment["end"]) for segment in manifest(tmp_path)] == [
+        ((BASE + timedelta(minutes=start)).timestamp(), (BASE + timedelta(minutes=start + 50)).timestamp())
+        for start in (0, 60)
+    ]
+
+
+def _append_from_process(path: str, first: int, count: int):
+    store = CallLogStore(path, None, segment_bytes=300, segment_hours=0)
+    for i in range(first, first + count):
+        store.append(entry(i))
+    # Let this process's compressions finish before it exits
+    time.sleep(0.5)
+
+
+def test_processes_share_the_log(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_append_from_process, args=(str(tmp_path / "calls.jsonl"), first, 50))
+        for first in (0, 1000, 2000)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    store = open_store(tmp_path)
+    wait_for_compression(tmp_path)
+    seen = [call["i"] for call in store.iter_calls()]
+    assert sorted(seen) == [*range(50), *range(1000, 1050), *range(2000, 2050)]
+    segments = manifest(tmp_path)
+    assert [segment["file"] for segment in segments] == [f"{n:06d}.jsonl.gz" for n in range(1, len(segments) + 1)]
+    assert not list((tmp_path / "calls.segments").glob("*.tmp"))
+
+
+def test_recovers_segment_missing_from_manifest(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(40):
+        store.append(entry(i))
+    wait_for_compression(tmp_path)
+    # A crash right after moving the active segment, before the manifest is written
+    number = len(manifest(tmp_path)) + 1
+    (tmp_path / "calls.jsonl").replace(tmp_path / "calls.segments" / f"{number:06d}.jsonl")
+
+    recovered = open_store(tmp_path)
+    assert manifest(tmp_path)[-1]["file"].startswith(f"{number:06d}.jsonl")
+    wait_for_compression(tmp_path)
+    assert [call["i"] for call in recovered.iter_calls()] == list(range(40))
+
+
+def test_recovery_keeps_compressions_in_progress(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(40):
+        store.append(entry(i))
+    wait_for_compression(tmp_path)
+    stale = tmp_path / "calls.segments" / "000001.jsonl.gz.tmp"
+    stale.write_bytes(b"partial")
+    running = tmp_path / "calls.segments" / "000002.jsonl.gz.tmp"
+    with open(running, "wb") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        open_store(tmp_path)
+        assert not stale.exists()
+        assert running.exists()
+
+
+def test_read_only_store_changes_nothing(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(40):
+        store.append(entry(i))
+    wait_for_compression(tmp_path)
+    number = len(manifest(tmp_path)) + 1
+    (tmp_path / "calls.jsonl").replace(tmp_path / "calls.segments" / f"{number:06d}.jsonl")
+    (tmp_path / "calls.segments" / "000001.jsonl.gz.tmp").write_bytes(b"partial")
+    before = sorted(path.name for path in (tmp_path / "calls.segments").iterdir())
+    before_manifest = manifest(tmp_path)
+
+    reader = open_store(tmp_path, read_only=True)
+    assert len(list(reader.iter_calls())) < 40
+    time.sleep(0.1)
+    assert sorted(path.name for path in (tmp_path / "calls.segments").iterdir()) == before
+    assert manifest(tmp_path) == before_manifest
+    with pytest.raises(PermissionError):
+        reader.append(entry(40))
+
+
+def test_reader_follows_other_writers(tmp_path):
+    writer = open_store(tmp_path)
+    reader = open_store(tmp_path, read_only=True)
+    for i in range(40):
+        writer.append(entry(i))
+        assert [call["i"] for call in reader.iter_calls()] == list(range(i + 1))
+
+
+def test_replay_does_not_block_appends(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(40):
+        store.append(entry(i))
+
+    seen = []
+    appended = []
+
+    def slow_listener(call):
+        if call["i"] == 0:
+            # Another thread saves a call while the replay is still running
+            thread = threading.Thread(target=lambda: appended.append(store.append(entry(40))))
+            thread.start()
+            thread.join(timeout=1)
+            assert appended, "append waited for the replay"
+        seen.append(call["i"])
+
+    store.subscribe(slow_listener)
+    store.append(entry(41))
+    assert seen == list(range(42))
+
+
+def test_replay_starts_at_a_position(tmp_path):
+    store = open_store(tmp_path)
+    for i in range(40):
+        store.append(entry(i))
+    seen = []
+    store.subscribe(lambda call: seen.append(call["i"]), start=25)
+    assert seen == list(range(25, 40))
+
+
+def test_log_file_is_resolved_when_the_store_is_created(tmp_path, monkeypatch):
+    from src.utils.storage import get_call_log_store
+
+    monkeypatch.setenv("CALL_LOG_FILE", str(tmp_path / "configured.jsonl"))
+    assert get_call_log_store(read_only=True).file_path == tmp_path / "configured.jsonl"
@@ -0,0 +1,48 @@
+from src.services.llm.streaming import IncrementalFieldParser
+
+COMPLETION = '{"priority": "RED", "summary": "man says \\"help\\"", "department": "EMS", "confidence": 90}'
+
+
+def feed_all(parser, chunks) -> list:
+    return [(i, fields) for i, chunk in enumerate(chunks) if (fields := parser.feed(chunk))]
+
+
+def test_fields_arriving_char_by_char():
+    parser = IncrementalFieldParser()
+    updates = feed_all(parser, COMPLETION)
+    assert parser.fields == {
+        "priority": "RED",
+        "summary": 'man says "help"',
+        "department": "EMS",
+        "confidence": 90,
+    }
+    # Each field is reported once
+    assert sorted(key for _, fields in updates for key in fields) == sorted(parser.fields)
+    assert parser.buffer == COMPLETION
+
+
+def test_priority_is_known_from_its_first_letter():
+    parser = IncrementalFieldParser()
+    assert parser.feed('{"priority": "') == {}
+    assert parser.feed("O") == {"priority": "ORANGE"}
+    assert parser.feed('RANGE", ') == {}
+
+
+def test_escaped_quotes_do_not_end_a_value():
+    parser = IncrementalFieldParser()
+    parser.feed('{"summary": "he said \\"')
+    assert "summary" not in parser.fields
+    assert parser.feed('stop\\" twice"') == {"summary": 'he said "stop" twice'}
+
+
+def test_bare_number_confidence_ends_at_the_closing_brace():
+    parser = IncrementalFieldParser()
+    assert parser.feed('{"priority": "GREEN", "confidence": 9') == {"priority": "GREEN"}
+    assert parser.feed("5") == {}
+    assert parser.feed("}") == {"confidence": 95}
+
+
+def test_confidence_is_streamed_as_the_final_integer():
+    parser = IncrementalFieldParser()
+    assert parser.feed('{"confidence": "90%"}') == {"confidence": 90}
+    assert IncrementalFieldParser().feed('{"confidence": "high"}') == {}
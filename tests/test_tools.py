@@ -0,0 +1,98 @@
+import sys
+import json
+
+from src.services.llm.result import Classification, Department, EmergencyPriority
+from src.tools import reclassify, train_local_model
+
+CALLS = [
+    {"timestamp": f"2024-10-26T14:{i:02d}:00", "call_text": text, "priority": priority,
+     "department": department, "summary": "logged", "confidence": "90"}
+    for i, (text, priority, department) in enumerate([
+        ("my house is on fire", "RED", "FIRDEPT"),
+        ("the kitchen is full of smoke", "RED", "FIRDEPT"),
+        ("my dad is bleeding", "RED", "EMS"),
+        ("i lost my cat", "GREEN", "POLICEDEPT"),
+        ("loud music next door", "GREEN", "POLICEDEPT"),
+        ("someone stole my bike", "ORANGE", "POLICEDEPT"),
+    ])
+]
+
+
+def legacy_data_dir(tmp_path):
+    with open(tmp_path / "call_logs.json", "w") as f:
+        json.dump(CALLS, f)
+    return str(tmp_path / "call_logs.jsonl")
+
+
+def test_train_reads_a_legacy_only_log(tmp_path, monkeypatch):
+    log_file = legacy_data_dir(tmp_path)
+    model_file = tmp_path / "model.json"
+    monkeypatch.setattr(sys, "argv", ["train", "--input", log_file, "--output", str(model_file)])
+    train_local_model.main()
+    assert model_file.exists()
+    # Read in place: nothing is migrated or locked
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["call_logs.json", "model.json"]
+
+
+def test_reclassify_reads_a_legacy_only_log(tmp_path):
+    log_file = legacy_data_dir(tmp_path)
+    output = tmp_path / "reclassified.jsonl"
+
+    def classify(call_text):
+        return Classification(EmergencyPriority.RED, Department.EMS, "stub", 90)
+
+    counts = reclassify.reclassify(log_file, str(output), classify, concurrency=2)
+    assert counts == {"classified": len(CALLS), "failed": 0, "skipped": 0}
+    with open(output) as f:
+        assert sorted(json.loads(line)["call_text"] for line in f) == sorted(call["call_text"] for call in CALLS)
+    assert not (tmp_path / "call_logs.jsonl").exists()
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class ToolCallingLLM:
+    """Stands in for the bare model; rate limited for the first `limited` requests."""
+
+    def __init__(self, limited: int = 0):
+        self.limited = limited
+        self.requests = 0
+
+    def invoke(self, messages, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        self.requests += 1
+        if self.requests <= self.limited:
+            raise RateLimitError("Rate limit reached")
+        args = {"priority": "RED", "department": "FIRDEPT", "summary": "house fire", "confidence": 90}
+        return AIMessage(content="", tool_calls=[{"name": "classify_call", "args": args, "id": "call_1"}])
+
+
+def test_reclassify_backs_off_rate_limits_on_the_bare_model(tmp_path, monkeypatch):
+    from functools import partial
+    from src.services.llm.classifier import LLMHandler, classify_with_llm
+
+    def no_resilient_client():
+        raise AssertionError("the batch tool must not go through ResilientLLM")
+
+    monkeypatch.setattr(LLMHandler, "get_client", no_resilient_client)
+    llm = ToolCallingLLM(limited=3)
+    classify = partial(classify_with_llm, llm=llm)
+    counts = reclassify.reclassify(
+        legacy_data_dir(tmp_path), str(tmp_path / "out.jsonl"), classify, concurrency=1, base_delay=0.001
+    )
+    assert counts == {"classified": len(CALLS), "failed": 0, "skipped": 0}
+    assert llm.requests == len(CALLS) + 3
+
+
+def test_loadtest_stub_answers_follow_up_turns_by_their_utterance():
+    from src.services.llm.classifier import build_messages
+    from src.services.llm.result import Classification as Result
+    from src.tools.loadtest import FALLBACK_TRANSCRIPTS, StubChatModel
+
+    answers = {call["call_text"]: call for call in FALLBACK_TRANSCRIPTS}
+    stub = StubChatModel(answers, latency=0, jitter=0)
+    first = Result.from_json(stub.invoke(build_messages("I lost my cat.", mode="text")).content)
+    follow_up = build_messages("My neighbor's house is on fire.", previous=first, mode="text")
+    assert Result.from_json(stub.invoke(follow_up).content).priority is EmergencyPriority.RED
@@ -0,0 +1,34 @@
+import time
+import threading
+
+from src.services.llm.result import Classification, Department, EmergencyPriority
+from src.services.llm.scheduler import ClassificationScheduler
+from src.services.llm.voting import aggregate, classify_by_vote
+
+
+def vote(priority: str) -> Classification:
+    return Classification(EmergencyPriority[priority], Department.EMS, priority.lower(), 90)
+
+
+def test_confidence_counts_every_requested_sample():
+    assert aggregate([vote("RED"), vote("RED")], samples=5).confidence == 40
+    assert aggregate([vote("RED"), vote("RED"), vote("GREEN")]).confidence == 67
+
+
+def test_each_sample_holds_its_own_scheduler_slot():
+    scheduler = ClassificationScheduler(max_in_flight=1)
+    lock = threading.Lock()
+    calls = []
+
+    def sample():
+        with lock:
+            calls.append(scheduler.in_flight)
+        time.sleep(0.05)
+        return vote("RED")
+
+    result = classify_by_vote(sample, samples=5, quorum=2, slot=lambda: scheduler.slot("help"))
+    assert result.priority is EmergencyPriority.RED
+    assert result.confidence <= 60
+    # Samples waiting for a slot when the quorum was reached never ran
+    assert len(calls) < 5
+    assert set(calls) == {1}